@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Icon Post-processing Benchmark
+Times each stage of the image path in generate_icon_openrouter() over a corpus
+of recorded model outputs and measures throughput at several worker counts.
+
+Stages (mirroring process_icon_image):
+    b64decode   base64 data URL payload -> bytes
+    open        Image.open (header parse only)
+    convert     convert("RGBA") (includes the actual decode)
+    grid        recover_pixel_grid (only with --downsample grid)
+    resize      resize to ICON_SIZE with NEAREST
+    save        PNG encode
+    optimize    optimize_png (only with --optimize)
+
+Usage:
+    # Benchmark the raw response cache (recorded model outputs)
+    python bench_icon_pipeline.py
+
+    # No cache yet? Synthesize model-sized images from existing icons
+    python bench_icon_pipeline.py --synthetic 100
+
+    # Compare against an earlier run
+    python bench_icon_pipeline.py --compare bench_results/<earlier>.json
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from foodicons.config import CACHE_DIR, ICON_SIZE, ICONS_DIR
+from foodicons.imaging import ProcessOptions, process_icon_image, recover_pixel_grid
+from foodicons.optimize import optimize_png
+
+
+SCRIPT_DIR = Path(__file__).parent
+RESULTS_DIR = SCRIPT_DIR / "bench_results"
+SYNTHETIC_SIZE = 1024  # Roughly what the image model returns
+
+
+def load_corpus(cache_dir: Path, synthetic: int = 0, limit: int | None = None) -> list[bytes]:
+    """
+    Recorded model outputs as base64 payloads, like the data URLs OpenRouter
+    returns. With `synthetic`, existing icons are upscaled to model size instead.
+    """
+    if synthetic:
+        corpus = []
+        for path in sorted(ICONS_DIR.glob("*.png"))[:synthetic]:
+            img = Image.open(path).convert("RGBA").resize((SYNTHETIC_SIZE, SYNTHETIC_SIZE), Image.Resampling.NEAREST)
+            buf = BytesIO()
+            img.save(buf, "PNG")
+            corpus.append(base64.b64encode(buf.getvalue()))
+        return corpus
+
+    paths = sorted(cache_dir.glob("*/*.bin"))[:limit]
+    return [base64.b64encode(path.read_bytes()) for path in paths]
+
+
+def _timed(stage: str, timings: dict, memory: dict, func):
+    """Run func, recording its wall time and peak Python heap growth."""
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = func()
+    timings.setdefault(stage, []).append(time.perf_counter() - start)
+    memory.setdefault(stage, []).append(tracemalloc.get_traced_memory()[1] - before)
+    return result
+
+
+def bench_stages(corpus: list[bytes], downsample: str = "nearest", optimize: bool = False) -> dict:
+    """Per-stage timing and memory for every item in the corpus."""
+    timings: dict[str, list[float]] = {}
+    memory: dict[str, list[int]] = {}
+    raster: dict[str, list[int]] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / "icon.png"
+        tracemalloc.start()
+        for payload in corpus:
+            raw = _timed("b64decode", timings, memory, lambda: base64.b64decode(payload))
+            img = _timed("open", timings, memory, lambda: Image.open(BytesIO(raw)))
+            img = _timed("convert", timings, memory, lambda: img.convert("RGBA"))
+            raster.setdefault("convert", []).append(img.width * img.height * len(img.getbands()))
+            if downsample == "grid":
+                img = _timed("grid", timings, memory, lambda: recover_pixel_grid(img))
+            icon = _timed("resize", timings, memory,
+                          lambda: img.resize((ICON_SIZE, ICON_SIZE), Image.Resampling.NEAREST))
+            _timed("save", timings, memory, lambda: icon.save(out_path, "PNG"))
+            if optimize:
+                _timed("optimize", timings, memory, lambda: optimize_png(out_path))
+        tracemalloc.stop()
+
+    stages = {}
+    for stage, values in timings.items():
+        ordered = sorted(values)
+        stages[stage] = {
+            "mean_ms": statistics.fmean(values) * 1000,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "peak_python_kb": max(memory[stage]) / 1024,
+        }
+        if stage in raster:
+            stages[stage]["raster_kb"] = max(raster[stage]) / 1024
+    stages["total_ms"] = sum(stage["mean_ms"] for stage in stages.values())
+    return stages
+
+
+def _process_one(payload: bytes, downsample: str) -> None:
+    with tempfile.NamedTemporaryFile(suffix=".png") as tmp:
+        options = ProcessOptions(downsample=downsample)
+        process_icon_image(base64.b64decode(payload), Path(tmp.name), options)
+
+
+def bench_throughput(corpus: list[bytes], worker_counts: list[int], downsample: str = "nearest") -> dict:
+    """Icons per second for the full post-processing path at each worker count."""
+    results = {}
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Warm the pool so process start-up isn't counted
+            list(executor.map(_process_one, corpus[:workers], [downsample] * workers))
+            start = time.perf_counter()
+            list(executor.map(_process_one, corpus, [downsample] * len(corpus), chunksize=4))
+            elapsed = time.perf_counter() - start
+        results[str(workers)] = {"icons_per_sec": len(corpus) / elapsed, "seconds": elapsed}
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(current: dict, previous: dict) -> None:
+    print(f"\nCompared with {previous.get('revision')} ({previous.get('time')}):")
+    for stage, stats in current["stages"].items():
+        old = previous.get("stages", {}).get(stage)
+        if not isinstance(stats, dict) or not isinstance(old, dict):
+            continue
+        change = (stats["mean_ms"] / old["mean_ms"] - 1) * 100 if old["mean_ms"] else 0
+        print(f"  {stage:10} {old['mean_ms']:8.2f} -> {stats['mean_ms']:8.2f} ms ({change:+.1f}%)")
+    for workers, stats in current["throughput"].items():
+        old = previous.get("throughput", {}).get(workers)
+        if old:
+            change = (stats["icons_per_sec"] / old["icons_per_sec"] - 1) * 100
+            print(f"  {workers:>2} workers {old['icons_per_sec']:8.1f} -> {stats['icons_per_sec']:8.1f} icons/s ({change:+.1f}%)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark icon post-processing stages")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                       help="Raw response cache to read the corpus from")
+    parser.add_argument("--synthetic", type=int, default=0,
+                       help="Use this many existing icons upscaled to model size instead of the cache")
+    parser.add_argument("--limit", type=int, default=None,
+                       help="Limit corpus size")
+    parser.add_argument("--downsample", choices=["nearest", "grid"], default="nearest",
+                       help="Downsample mode to benchmark")
+    parser.add_argument("--optimize", action="store_true",
+                       help="Include the PNG optimization stage")
+    parser.add_argument("--workers", type=str, default="1,2,4,8",
+                       help="Worker counts for the throughput run")
+    parser.add_argument("--output", type=str, default=None,
+                       help="Where to write the JSON results")
+    parser.add_argument("--compare", type=str, default=None,
+                       help="Earlier results JSON to compare against")
+
+    args = parser.parse_args()
+
+    cache_dir = Path(args.cache_dir) if args.cache_dir else CACHE_DIR
+    corpus = load_corpus(cache_dir, args.synthetic, args.limit)
+    if not corpus:
+        print(f"Error: no recorded outputs in {cache_dir}. Run `foodicons generate` first or use --synthetic N.")
+        sys.exit(1)
+
+    source = f"{args.synthetic} synthetic" if args.synthetic else str(cache_dir)
+    print(f"Benchmarking {len(corpus)} images from {source}...")
+
+    stages = bench_stages(corpus, args.downsample, args.optimize)
+    print("\nPer-icon stage costs:")
+    for stage, stats in stages.items():
+        if isinstance(stats, dict):
+            print(f"  {stage:10} mean {stats['mean_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+                  f"peak {stats['peak_python_kb']:8.1f} KB")
+    print(f"  {'total':10} mean {stages['total_ms']:8.2f} ms")
+
+    worker_counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    throughput = bench_throughput(corpus, worker_counts, args.downsample)
+    print("\nThroughput:")
+    for workers, stats in throughput.items():
+        print(f"  {workers:>2} workers  {stats['icons_per_sec']:8.1f} icons/s")
+
+    results = {
+        "revision": git_revision(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "corpus": {"source": source, "images": len(corpus)},
+        "downsample": args.downsample,
+        "stages": stages,
+        "throughput": throughput,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['revision']}-{int(time.time())}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+Runs each foodicons subcommand with --help under `python -X importtime` and
+records wall time, total import time and which heavy dependencies got
+loaded, so regressions in the lazy-import layout show up in CI.
+
+Usage:
+    python bench_startup.py
+
+    # Also time another entry point, e.g. the old single-file script
+    git show <rev>:scripts/generate_food_icons.py > /tmp/old_gfi.py
+    python bench_startup.py --baseline /tmp/old_gfi.py
+
+    # Compare against an earlier run
+    python bench_startup.py --compare bench_results/startup-<earlier>.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).parent
+RESULTS_DIR = SCRIPT_DIR / "bench_results"
+COMMANDS = ("", "curate", "fetch", "generate", "postprocess", "publish")
+HEAVY_MODULES = ("requests", "PIL", "numpy")
+
+
+def parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    """Total import time in ms and the set of top-level packages imported."""
+    total_us = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # Nested imports are already in their parent's cumulative time
+            total_us += int(cumulative)
+        packages.add(name.strip().split(".")[0])
+    return total_us / 1000, packages
+
+
+def time_command(argv: list[str], repeat: int) -> dict:
+    """Median wall and import time for `python -X importtime <argv> --help`."""
+    walls, imports = [], []
+    packages: set[str] = set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *argv, "--help"], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        if proc.returncode:
+            raise RuntimeError(f"{' '.join(argv)} failed:\n{proc.stderr[-2000:]}")
+        import_ms, packages = parse_importtime(proc.stderr)
+        imports.append(import_ms)
+    return {
+        "wall_ms": statistics.median(walls) * 1000,
+        "import_ms": statistics.median(imports),
+        "heavy": sorted(packages & set(HEAVY_MODULES)),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(current: dict, previous: dict) -> None:
+    print(f"\nCompared with {previous.get('revision')} ({previous.get('time')}):")
+    for name, stats in current["commands"].items():
+        old = previous.get("commands", {}).get(name)
+        if old:
+            change = (stats["wall_ms"] / old["wall_ms"] - 1) * 100
+            print(f"  {name:28} {old['wall_ms']:8.1f} -> {stats['wall_ms']:8.1f} ms ({change:+.1f}%)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark foodicons CLI start-up")
+    parser.add_argument("--repeat", type=int, default=5,
+                       help="Runs per command (the median is reported)")
+    parser.add_argument("--baseline", type=str, action="append", default=[],
+                       help="Also time this script with --help (repeatable)")
+    parser.add_argument("--output", type=str, default=None,
+                       help="Where to write the JSON results")
+    parser.add_argument("--compare", type=str, default=None,
+                       help="Earlier results JSON to compare against")
+
+    args = parser.parse_args()
+
+    targets = {f"foodicons {command}".strip(): ["-m", "foodicons", *([command] if command else [])]
+               for command in COMMANDS}
+    targets["generate_food_icons.py"] = ["generate_food_icons.py"]
+    for path in args.baseline:
+        targets[Path(path).name] = [str(Path(path).resolve())]
+
+    print(f"Start-up with --help (median of {args.repeat}):")
+    commands = {}
+    for name, argv in targets.items():
+        stats = commands[name] = time_command(argv, args.repeat)
+        print(f"  {name:28} wall {stats['wall_ms']:7.1f} ms  imports {stats['import_ms']:7.1f} ms  "
+              f"{', '.join(stats['heavy']) or '-'}")
+
+    results = {
+        "revision": git_revision(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "commands": commands,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"startup-{results['revision']}-{int(time.time())}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
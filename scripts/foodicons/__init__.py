@@ -0,0 +1,89 @@
+"""
+Food Icon Generator
+1. Fetches food items from Open Food Facts API
+2. Generates pixel art icons using OpenRouter AI
+3. Post-processes and publishes them for the web and native apps
+
+Usage:
+    pip install requests pillow
+    export OPENROUTER_API_KEY="your_key"
+    cd scripts  # foodicons is run as a module from here
+
+    # Step 1: Fetch food list (or write the curated one)
+    python -m foodicons fetch
+    python -m foodicons curate
+
+    # ...also harvesting product names from the popular categories
+    python -m foodicons fetch --harvest --harvest-pages 3
+
+    # Rebuild the list from the local HTTP cache only (no network)
+    python -m foodicons fetch --offline
+
+    # Optional: collapse near-duplicates (almond/almonds) into aliases
+    python -m foodicons curate --cluster
+
+    # Step 2: Generate icons
+    python -m foodicons generate
+
+    # Only the 100 names the app most often fell back to a category icon for
+    python -m foodicons generate --misses icon_misses.jsonl --top 100
+
+    # Keep 8 requests in flight at once
+    python -m foodicons generate --jobs 8
+
+    # Fall back to a second model when the first keeps failing (slow requests are hedged)
+    python -m foodicons generate --models google/gemini-2.5-flash-image,google/gemini-2.5-flash-image-preview
+
+    # Draw 4 foods per request as a 2x2 grid; rejected cells are retried singly
+    python -m foodicons generate --batch 4
+
+    # Let rate-limit feedback pick the concurrency, up to 32 in flight
+    python -m foodicons generate --adaptive --jobs 32
+
+    # Per-request metrics go to foods.metrics.jsonl; also export for Prometheus
+    python -m foodicons generate --prometheus-textfile /var/lib/node_exporter/foodicons.prom
+
+    # Rerun only what the journal says still needs work
+    python -m foodicons generate --resume --max-attempts 3
+    python -m foodicons generate --retry-failed
+
+    # Point generation at a local stand-in (see openrouter_standin.py / load_test.py)
+    python -m foodicons generate --openrouter-url http://127.0.0.1:8090/api/v1
+
+    # Rebuild food_icons/ from cached raw model output (no API calls)
+    python -m foodicons postprocess --reprocess
+
+    # Snap model output to its logical pixel grid instead of blind resizing
+    python -m foodicons postprocess --reprocess --downsample grid
+
+    # Also write native 32px and 2x variants in lossless WebP/AVIF + a size report
+    python -m foodicons postprocess --reprocess --formats png,webp,avif
+
+    # Shrink existing icons to indexed palettes (also runs after generate)
+    python -m foodicons postprocess --optimize
+
+    # Find near-identical icons; --collapse keeps one and aliases the rest
+    python -m foodicons postprocess --dedupe-icons --collapse
+
+    # Build every publish target (manifest, resolver, atlas, native, web)
+    python -m foodicons publish
+
+    # Pack icons into sprite sheets + atlas.json index
+    python -m foodicons publish --atlas
+
+    # Precompute name -> icon lookups so the app never probes for 404s
+    python -m foodicons publish --manifest
+
+    # Compile a fuzzy token index ("greek yogurt cup" -> greek_yogurt) and report its hit rate
+    python -m foodicons publish --resolver --resolver-sample names.tsv
+
+    # Copy changed icons into public/food-icons and swap it in atomically;
+    # --hashed adds name.<hash>.png copies and icon-map.json for immutable caching
+    python -m foodicons publish --web --hashed
+
+    # Bundle icons into the Android/iOS Capacitor shells (incremental)
+    python -m foodicons publish --native
+
+Subcommands import only the modules they need, so `curate` and `--help`
+start without loading requests, Pillow or numpy (see bench_startup.py).
+"""
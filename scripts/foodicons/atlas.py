@@ -0,0 +1,119 @@
+"""Sprite atlas - pack icons into a few sheets plus a coordinate index."""
+
+import json
+import hashlib
+from pathlib import Path
+
+from PIL import Image
+
+from .config import ATLAS_INDEX, ICON_SIZE
+
+
+# Slot and content-hash bookkeeping for incremental rebuilds; a dotfile so web publish skips it
+ATLAS_STATE = ".atlas_state.json"
+
+
+def build_atlas(icons_dir: Path, atlas_dir: Path, sheet_size: int = 1024) -> dict:
+    """
+    Pack every icon in `icons_dir` into square sprite sheets of `sheet_size`
+    pixels plus an index of name -> [sheet, x, y, w, h].
+    Icons keep their slot across rebuilds (tracked in ATLAS_STATE), so only
+    sheets containing added, changed or removed icons are rewritten.
+    Returns rebuild stats.
+    """
+    cell = ICON_SIZE
+    per_row = sheet_size // cell
+    per_sheet = per_row * per_row
+    index_path = atlas_dir / ATLAS_INDEX
+    state_path = atlas_dir / ATLAS_STATE
+
+    previous = {}
+    if state_path.exists():
+        with open(state_path) as f:
+            previous = json.load(f)
+        if previous.get("cell") != cell or previous.get("sheetSize") != sheet_size:
+            previous = {}  # Layout changed, start over
+
+    old_slots: dict[str, int] = previous.get("slots", {})
+    old_hashes: dict[str, str] = previous.get("hashes", {})
+
+    hashes = {}
+    for path in sorted(icons_dir.glob("*.png")):
+        hashes[path.stem] = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    # Keep existing slots, hand out the lowest free ones to new icons
+    slots = {name: slot for name, slot in old_slots.items() if name in hashes}
+    used = set(slots.values())
+    free_slot = 0
+    for name in hashes:
+        if name in slots:
+            continue
+        while free_slot in used:
+            free_slot += 1
+        slots[name] = free_slot
+        used.add(free_slot)
+
+    changed = {name for name in hashes if old_hashes.get(name) != hashes[name] or old_slots.get(name) != slots[name]}
+    removed = {name for name in old_slots if name not in hashes}
+    dirty_cells: dict[int, list[int]] = {}
+    for name in changed:
+        dirty_cells.setdefault(slots[name] // per_sheet, []).append(slots[name])
+    for name in removed:
+        dirty_cells.setdefault(old_slots[name] // per_sheet, []).append(old_slots[name])
+
+    sheet_count = max(used) // per_sheet + 1 if used else 0
+    by_slot = {slot: name for name, slot in slots.items()}
+    atlas_dir.mkdir(parents=True, exist_ok=True)
+
+    rewritten = 0
+    for sheet in range(sheet_count):
+        sheet_path = atlas_dir / f"atlas-{sheet}.png"
+        if sheet_path.exists() and sheet not in dirty_cells:
+            continue
+
+        if sheet_path.exists():
+            canvas = Image.open(sheet_path).convert("RGBA")
+            cells = dirty_cells[sheet]
+        else:
+            canvas = Image.new("RGBA", (sheet_size, sheet_size), (0, 0, 0, 0))
+            cells = range(sheet * per_sheet, (sheet + 1) * per_sheet)
+
+        for slot in cells:
+            local = slot - sheet * per_sheet
+            x, y = (local % per_row) * cell, (local // per_row) * cell
+            canvas.paste((0, 0, 0, 0), (x, y, x + cell, y + cell))
+            name = by_slot.get(slot)
+            if name is None:
+                continue
+            icon = Image.open(icons_dir / f"{name}.png").convert("RGBA")
+            if icon.size != (cell, cell):
+                icon = icon.resize((cell, cell), Image.Resampling.NEAREST)
+            canvas.paste(icon, (x, y))
+
+        canvas.save(sheet_path, "PNG", optimize=True)
+        rewritten += 1
+
+    # Drop sheets that are no longer needed
+    for sheet_path in atlas_dir.glob("atlas-*.png"):
+        if int(sheet_path.stem.split("-")[1]) >= sheet_count:
+            sheet_path.unlink()
+
+    icons = {}
+    for name in sorted(slots):
+        local = slots[name] % per_sheet
+        icons[name] = [slots[name] // per_sheet, (local % per_row) * cell, (local // per_row) * cell, cell, cell]
+
+    index = {
+        "version": 1,
+        "cell": cell,
+        "sheetSize": sheet_size,
+        "sheets": [f"atlas-{sheet}.png" for sheet in range(sheet_count)],
+        "icons": icons,
+    }
+    with open(index_path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    with open(state_path, "w") as f:
+        json.dump({"cell": cell, "sheetSize": sheet_size, "slots": slots, "hashes": hashes}, f)
+
+    return {"icons": len(hashes), "sheets": sheet_count, "rewritten": rewritten,
+            "changed": len(changed), "removed": len(removed)}
@@ -0,0 +1,58 @@
+"""Raw response cache - replay post-processing without calling the API."""
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+
+
+class RawCache:
+    """
+    Content-addressed store of raw decoded model images.
+    Entries are keyed by a hash of model + prompt + food name and stored as
+    <dir>/<key[:2]>/<key>.bin. Reads bump the file's mtime so eviction can
+    drop the least recently used entries first.
+    """
+
+    def __init__(self, path: Path, max_bytes: int | None = None):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(model: str, prompt: str, food_name: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}\0{food_name}".encode()).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.bin"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._file(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._file(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def evict(self) -> tuple[int, int]:
+        """Delete least recently used entries until under max_bytes. Returns (files, bytes) removed."""
+        if self.max_bytes is None or not self.path.exists():
+            return 0, 0
+        entries = [(p.stat(), p) for p in self.path.glob("*/*.bin")]
+        total = sum(st.st_size for st, _ in entries)
+        removed = freed = 0
+        for st, p in sorted(entries, key=lambda e: e[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= st.st_size
+            removed += 1
+            freed += st.st_size
+        return removed, freed
@@ -0,0 +1,600 @@
+"""
+Command line entry point.
+Only argparse and config are imported up front; each subcommand imports the
+modules it needs when it runs, so `curate` or `--help` never load requests,
+Pillow or numpy.
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from .config import (ALIASES_FILE, ANDROID_RES_DIR, ATLAS_DIR, CACHE_DIR, FOODS_FILE, HTTP_CACHE_DIR,
+                     ICON_MODEL, ICONS_DIR, IOS_ASSETS_DIR, IOS_ICON_FOLDER, JOURNAL_FILE, MANIFEST_FILE,
+                     MAX_BATCH, METRICS_FILE, NATIVE_SIZE, OFF_BASE_URL, PUBLIC_ICONS_DIR, RESOLVER_SAMPLE,
+                     load_env, openrouter_base_url)
+
+
+def _load_foods() -> list | None:
+    """foods.json contents, or None (with an error printed) if it doesn't exist yet."""
+    if not FOODS_FILE.exists():
+        print(f"Error: {FOODS_FILE} not found. Run `fetch` or `curate` first.")
+        return None
+    with open(FOODS_FILE) as f:
+        return json.load(f)
+
+
+def _output_dir(args) -> Path:
+    return Path(args.output) if args.output else ICONS_DIR
+
+
+def _http_client(args, jobs: int = 1, http_cache=None):
+    from .net import HttpClient
+
+    return HttpClient(pool_size=max(10, jobs), read_timeout=args.timeout,
+                      max_retries=args.max_retries, http_cache=http_cache)
+
+
+def _process_options(args):
+    """ProcessOptions from --downsample/--formats, or None if a format is unsupported."""
+    from .imaging import ProcessOptions, available_web_formats
+
+    formats = tuple(fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip())
+    unsupported = [fmt for fmt in formats if fmt not in available_web_formats()]
+    if unsupported:
+        print(f"Error: unsupported format(s) {', '.join(unsupported)} "
+              f"(available: {', '.join(available_web_formats())})")
+        return None
+    return ProcessOptions(downsample=args.downsample, formats=formats)
+
+
+def _finish_icons(args, output_dir: Path, foods: list, options) -> None:
+    """
+    Optimize the icons written for `foods` and their web PNG variants, then
+    report web formats, as requested. Variants are optimized first so the
+    report compares every PNG on the same basis.
+    """
+    from .imaging import WEB_DIR, write_format_report
+    from .optimize import optimize_icons, print_optimize_summary
+    from .util import safe_filename
+
+    if not args.no_optimize:
+        stems = [safe_filename(food["name"] if isinstance(food, dict) else food) for food in foods]
+        paths = [output_dir / f"{stem}.png" for stem in stems]
+        paths += [output_dir / WEB_DIR / f"{stem}@{scale}x.png" for stem in stems for scale in (1, 2)]
+        paths = [path for path in paths if path.exists()]
+        print(f"\nOptimizing {len(paths)} PNGs...")
+        print_optimize_summary(len(paths), *optimize_icons(paths, args.palette_colors))
+
+    if options.formats:
+        write_format_report(output_dir)
+
+
+def _write_manifest(output_dir: Path, aliases: dict) -> dict:
+    from .manifest import build_manifest
+
+    manifest = build_manifest(output_dir, aliases)
+    with open(output_dir / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    return manifest
+
+
+# =============================================================================
+# Subcommands
+# =============================================================================
+def cmd_curate(args) -> int:
+    if args.cluster:
+        return _cluster(args)
+
+    from .foods import CURATED_FOODS, get_curated_foods
+
+    foods = get_curated_foods()
+    with open(FOODS_FILE, "w") as f:
+        json.dump(foods, f, indent=2)
+
+    print(f"Saved {len(foods)} curated foods to {FOODS_FILE}")
+    print("\nCategories:")
+    for cat, items in CURATED_FOODS.items():
+        print(f"  {cat}: {len(items)} items")
+    return 0
+
+
+def _cluster(args) -> int:
+    from .clustering import cluster_foods, load_aliases, save_aliases
+
+    foods = _load_foods()
+    if foods is None:
+        return 1
+
+    representatives, new_aliases = cluster_foods(foods, _output_dir(args), args.cluster_threshold)
+    aliases = load_aliases()
+    aliases.update(new_aliases)
+    save_aliases(aliases)
+
+    with open(FOODS_FILE, "w") as f:
+        json.dump(representatives, f, indent=2)
+
+    print(f"Clustered {len(foods)} foods into {len(representatives)} "
+          f"({len(foods) - len(representatives)} became aliases)")
+    print("\nSample clusters:")
+    for food in [food for food in representatives if food.get("aliases")][:20]:
+        print(f"  {food['name']} <- {', '.join(food['aliases'])}")
+    print(f"\nSaved {len(representatives)} foods to {FOODS_FILE}")
+    print(f"Aliases saved to: {ALIASES_FILE}")
+    return 0
+
+
+def cmd_fetch(args) -> int:
+    from .fetch import fetch_foods_from_open_food_facts, fetch_foods_from_spoonacular
+    from .net import HttpCache
+
+    load_env()
+    http_cache = None
+    if not args.no_http_cache:
+        http_cache = HttpCache(HTTP_CACHE_DIR, ttl=args.http_cache_ttl * 3600, offline=args.offline)
+    client = _http_client(args, http_cache=http_cache)
+
+    if args.spoonacular_key:
+        foods = fetch_foods_from_spoonacular(args.spoonacular_key, args.limit, client,
+                                             workers=args.spoonacular_workers,
+                                             rate=args.spoonacular_rate)
+    else:
+        foods = fetch_foods_from_open_food_facts(
+            args.limit, client, base_url=args.off_url.rstrip("/"), harvest=args.harvest,
+            harvest_pages=args.harvest_pages, harvest_workers=args.harvest_workers,
+            harvest_rate=args.harvest_rate / 60)
+
+    with open(FOODS_FILE, "w") as f:
+        json.dump(foods, f, indent=2)
+
+    print(f"\nSaved {len(foods)} foods to {FOODS_FILE}")
+    print("\nSample foods:")
+    for food in foods[:20]:
+        print(f"  - {food['name']}")
+    return 0
+
+
+def _miss_foods(args) -> list[dict] | None:
+    """Top missed names from --misses logs, also added to foods.json for later reprocessing."""
+    from .clustering import load_aliases
+    from .misses import MissCounter, print_miss_summary
+    from .util import safe_filename
+
+    misses = MissCounter()
+    for path in args.misses:
+        if not Path(path).exists():
+            print(f"Error: miss log {path} not found")
+            return None
+        misses.read(Path(path))
+
+    foods, covered = misses.top_missing(args.top, _output_dir(args), load_aliases())
+    print_miss_summary(misses, foods, covered)
+    foods = [{key: value for key, value in food.items() if key != "misses"} for food in foods]
+
+    known = []
+    if FOODS_FILE.exists():
+        with open(FOODS_FILE) as f:
+            known = json.load(f)
+    names = {safe_filename(food["name"] if isinstance(food, dict) else food) for food in known}
+    added = [food for food in foods if safe_filename(food["name"]) not in names]
+    if added:
+        with open(FOODS_FILE, "w") as f:
+            json.dump(known + added, f, indent=2)
+        print(f"Added {len(added)} names to {FOODS_FILE}\n")
+    return foods
+
+
+def cmd_generate(args) -> int:
+    options = _process_options(args)
+    if options is None:
+        return 1
+    foods = _miss_foods(args) if args.misses else _load_foods()
+    if foods is None:
+        return 1
+    if not foods:
+        print("Nothing to generate")
+        return 0
+
+    load_env()
+    api_key = os.environ.get("OPENROUTER_API_KEY")
+    if not api_key:
+        print("Error: OPENROUTER_API_KEY environment variable not set")
+        return 1
+
+    from .cache import RawCache
+    from .clustering import drop_aliased, load_aliases
+    from .generate import ModelRouter
+    from .net import AdaptiveConcurrency
+    from .run import Journal, RunMetrics, generate_icons, select_pending
+
+    output_dir = _output_dir(args)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    client = _http_client(args, args.jobs)
+    cache = None if args.no_cache else RawCache(CACHE_DIR, args.cache_max_mb * 1024 * 1024)
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    base_url = (args.openrouter_url or openrouter_base_url()).rstrip("/")
+
+    journal = Journal(Path(args.journal) if args.journal else JOURNAL_FILE)
+    foods = drop_aliased(foods, load_aliases())[:args.limit]
+    pending = select_pending(foods, journal, output_dir, resume=args.resume,
+                             retry_failed=args.retry_failed, max_attempts=args.max_attempts)
+
+    print(f"Generating icons for {len(pending)} foods...")
+    if len(pending) < len(foods):
+        print(f"Skipping {len(foods) - len(pending)} foods per journal {journal.path.name}")
+    print(f"Output directory: {output_dir}")
+    print(f"Concurrent jobs: {f'adaptive, up to {args.jobs}' if args.adaptive else args.jobs}\n")
+
+    concurrency = None
+    if args.adaptive:
+        concurrency = AdaptiveConcurrency(initial=min(4, args.jobs), maximum=args.jobs)
+    metrics = RunMetrics(Path(args.metrics) if args.metrics else METRICS_FILE, len(pending),
+                         Path(args.prometheus_textfile) if args.prometheus_textfile else None,
+                         concurrency=concurrency)
+    router = ModelRouter(models, hedge=not args.no_hedge, breaker_threshold=args.breaker_failures,
+                         breaker_cooldown=args.breaker_cooldown, max_in_flight=args.jobs,
+                         on_loser=metrics.record_loser)
+    try:
+        # The controller replaces the fixed per-request sleep
+        success, failed = generate_icons(pending, output_dir, api_key, jobs=args.jobs,
+                                         delay=0 if concurrency else 1.0,
+                                         client=client, journal=journal, cache=cache,
+                                         options=options, base_url=base_url,
+                                         metrics=metrics, concurrency=concurrency,
+                                         batch_size=args.batch, router=router)
+        _finish_icons(args, output_dir, pending, options)
+        # Optimizing rewrote the PNGs; the journal's hashes should match what ships
+        journal.refresh_digests(output_dir, pending)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted - skipped post-processing. Rerun with --resume to continue "
+              f"from {journal.path.name}.")
+        return 130
+    finally:
+        router.close()
+        journal.close()
+        metrics.close()
+        if cache:
+            removed, freed = cache.evict()
+            if removed:
+                print(f"Evicted {removed} cache entries ({freed / 1024 / 1024:.1f} MB)")
+
+    print(f"\n{'='*50}")
+    print(f"Complete! {success} generated, {failed} failed")
+    print(f"Icons saved to: {output_dir}")
+    counts = ", ".join(f"{n} {status}" for status, n in sorted(journal.counts().items()))
+    print(f"Journal ({journal.path.name}): {counts}")
+    for line in metrics.summary():
+        print(line)
+    print(router.summary())
+    print(f"Metrics: {metrics.path}")
+    return 0
+
+
+def cmd_postprocess(args) -> int:
+    output_dir = _output_dir(args)
+    if args.reprocess:
+        return _reprocess(args, output_dir)
+    if args.dedupe_icons:
+        return _dedupe(args, output_dir)
+
+    from .imaging import WEB_DIR
+    from .optimize import optimize_icons, print_optimize_summary
+
+    paths = sorted(output_dir.glob("*.png")) + sorted((output_dir / WEB_DIR).glob("*@*x.png"))
+    print(f"Optimizing {len(paths)} PNGs in {output_dir}...")
+    before, after = optimize_icons(paths, args.palette_colors)
+    print_optimize_summary(len(paths), before, after)
+    return 0
+
+
+def _reprocess(args, output_dir: Path) -> int:
+    if args.no_cache:
+        print("Error: --reprocess needs the raw response cache (drop --no-cache)")
+        return 1
+    options = _process_options(args)
+    if options is None:
+        return 1
+    foods = _load_foods()
+    if foods is None:
+        return 1
+
+    from .cache import RawCache
+    from .clustering import drop_aliased, load_aliases
+    from .generate import reprocess_from_cache
+
+    cache = RawCache(CACHE_DIR, args.cache_max_mb * 1024 * 1024)
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    # Names collapsed into another icon stay aliases; rebuilding them would undo the dedupe
+    foods = drop_aliased(foods, load_aliases())[:args.limit]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Reprocessing {len(foods)} icons from {cache.path}...")
+    rebuilt, missing = reprocess_from_cache(foods, output_dir, cache, options, models)
+    _finish_icons(args, output_dir, foods, options)
+
+    print(f"\n{'='*50}")
+    print(f"Complete! {rebuilt} rebuilt, {missing} not in cache")
+    print(f"Icons saved to: {output_dir}")
+    return 0
+
+
+def _dedupe(args, output_dir: Path) -> int:
+    from .clustering import drop_aliased, load_aliases, save_aliases
+    from .dedupe import collapse_duplicate_icons, find_duplicate_icons
+
+    clusters = find_duplicate_icons(output_dir, args.dedupe_radius)
+    print(f"Found {len(clusters)} clusters of near-identical icons:")
+    for members in clusters:
+        print(f"  {', '.join(members)}")
+
+    if args.collapse and clusters:
+        aliases = load_aliases()
+        removed = collapse_duplicate_icons(output_dir, clusters, aliases)
+        save_aliases(aliases)
+        print(f"\nRemoved {removed} icons, aliases saved to: {ALIASES_FILE}")
+        if FOODS_FILE.exists():
+            # Like `curate --cluster`: collapsed names leave the list so they're never drawn again
+            with open(FOODS_FILE) as f:
+                foods = json.load(f)
+            kept = drop_aliased(foods, aliases)
+            if len(kept) < len(foods):
+                with open(FOODS_FILE, "w") as f:
+                    json.dump(kept, f, indent=2)
+                print(f"Dropped {len(foods) - len(kept)} collapsed names from {FOODS_FILE}")
+        if (output_dir / MANIFEST_FILE).exists():
+            _write_manifest(output_dir, aliases)
+            print(f"Updated {output_dir / MANIFEST_FILE}")
+    return 0
+
+
+# Order matters: web mirrors the manifest and resolver written before it
+PUBLISH_TARGETS = ("manifest", "resolver", "atlas", "native", "web")
+
+
+def cmd_publish(args) -> int:
+    output_dir = _output_dir(args)
+    targets = [target for target in PUBLISH_TARGETS if getattr(args, target)] or list(PUBLISH_TARGETS)
+
+    if "manifest" in targets:
+        from .clustering import load_aliases
+
+        manifest = _write_manifest(output_dir, load_aliases())
+        print(f"Mapped {len(manifest['keys'])} keys to {len(set(manifest['files']))} icons")
+        print(f"Manifest saved to: {output_dir / MANIFEST_FILE}")
+
+    if "resolver" in targets:
+        from .clustering import load_aliases
+        from .resolver import (RESOLVER_FILE, Resolver, build_resolver, evaluate_resolver,
+                               print_resolver_report, read_sample)
+
+        index = build_resolver(output_dir, load_aliases())
+        with open(output_dir / RESOLVER_FILE, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        size = (output_dir / RESOLVER_FILE).stat().st_size
+        print(f"Indexed {len(index['tokens'])} tokens over {len(index['entries'])} names ({size / 1024:.1f} KB)")
+        print(f"Resolver saved to: {output_dir / RESOLVER_FILE}")
+        sample = Path(args.resolver_sample) if args.resolver_sample else RESOLVER_SAMPLE
+        if sample.exists():
+            print_resolver_report(evaluate_resolver(Resolver(index), read_sample(sample)))
+
+    if "atlas" in targets:
+        from .atlas import build_atlas
+
+        atlas_dir = Path(args.atlas_dir) if args.atlas_dir else ATLAS_DIR
+        stats = build_atlas(output_dir, atlas_dir)
+        print(f"Packed {stats['icons']} icons into {stats['sheets']} sheets "
+              f"({stats['changed']} changed, {stats['removed']} removed, "
+              f"{stats['rewritten']} sheets rewritten)")
+        print(f"Atlas saved to: {atlas_dir}")
+
+    if "native" in targets:
+        from .native import export_native_icons
+
+        android_res = Path(args.android_res) if args.android_res else ANDROID_RES_DIR
+        ios_assets = Path(args.ios_assets) if args.ios_assets else IOS_ASSETS_DIR
+        stats = export_native_icons(output_dir, android_res, ios_assets)
+        print(f"Exported {stats['icons']} icons ({stats['rendered']} rendered, {stats['removed']} removed)")
+        print(f"Android: {android_res}/drawable-*/food_<name>.png")
+        print(f"iOS: {ios_assets / IOS_ICON_FOLDER}")
+
+    if "web" in targets:
+        from .web import ICON_MAP_FILE, publish_web_icons
+
+        web_dir = Path(args.web_dir) if args.web_dir else PUBLIC_ICONS_DIR
+        atlas_dir = Path(args.atlas_dir) if args.atlas_dir else ATLAS_DIR
+        stats = publish_web_icons(output_dir, web_dir, hashed=args.hashed,
+                                  atlas_dir=atlas_dir if atlas_dir.exists() else None)
+        print(f"Published {stats['files']} files ({stats['added']} added, {stats['changed']} changed, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged, "
+              f"{stats['bytes_written'] / 1024:.1f} KB written)")
+        print(f"Web: {web_dir}" + ("" if stats["swapped"] else " (already up to date)")
+              + (f", hashed names in {ICON_MAP_FILE}" if args.hashed else "")
+              + (f", kept {stats['kept']} hashed files from the previous publish" if stats["kept"] else ""))
+    return 0
+
+
+# =============================================================================
+# Argument Parsing
+# =============================================================================
+def _palette_size(value: str) -> int:
+    """argparse type for --palette-colors: PNG palettes hold at most 256 entries."""
+    size = int(value)
+    if not 2 <= size <= 256:
+        raise argparse.ArgumentTypeError(f"must be between 2 and 256, got {size}")
+    return size
+
+
+def build_parser() -> argparse.ArgumentParser:
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--output", type=str, default=None,
+                       help=f"Icon directory (default: {ICONS_DIR.name})")
+
+    http = argparse.ArgumentParser(add_help=False)
+    http.add_argument("--timeout", type=float, default=120.0,
+                     help="Read timeout in seconds for each HTTP request")
+    http.add_argument("--max-retries", type=int, default=4,
+                     help="Retries per request on 429/5xx/connection errors")
+
+    processing = argparse.ArgumentParser(add_help=False)
+    processing.add_argument("--limit", type=int, default=1000,
+                           help="Limit number of foods to process")
+    processing.add_argument("--models", type=str, default=ICON_MODEL,
+                           help="Comma-separated image models in fallback order")
+    processing.add_argument("--no-cache", action="store_true",
+                           help="Don't read or write the raw response cache")
+    processing.add_argument("--cache-max-mb", type=int, default=2048,
+                           help="Evict least recently used cache entries above this size")
+    processing.add_argument("--downsample", choices=["nearest", "grid"], default="nearest",
+                           help="How to shrink model output: blind nearest-neighbour or pixel-grid recovery")
+    processing.add_argument("--formats", type=str, default="",
+                           help=f"Also write {NATIVE_SIZE}px and 2x web variants, e.g. png,webp,avif")
+    processing.add_argument("--no-optimize", action="store_true",
+                           help="Skip the PNG optimization pass afterwards")
+    processing.add_argument("--palette-colors", type=_palette_size, default=256,
+                           help="Maximum palette size when optimizing PNGs (2-256)")
+
+    parser = argparse.ArgumentParser(prog="foodicons", description="Generate pixel art food icons")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    curate = commands.add_parser("curate", parents=[output], help="Write the curated food list to foods.json",
+                                 description="Write the curated food list, or cluster foods.json with --cluster")
+    curate.add_argument("--cluster", action="store_true",
+                       help="Collapse near-duplicate names in foods.json into aliases instead")
+    curate.add_argument("--cluster-threshold", type=float, default=1.0,
+                       help="Token Jaccard similarity needed to cluster two names (0-1]")
+    curate.set_defaults(handler=cmd_curate)
+
+    fetch = commands.add_parser("fetch", parents=[http], help="Fetch the food list from Open Food Facts",
+                                description="Fetch the food list into foods.json")
+    fetch.add_argument("--limit", type=int, default=1000,
+                      help="Limit number of foods to fetch")
+    fetch.add_argument("--harvest", action="store_true",
+                      help="Also walk Open Food Facts category product pages")
+    fetch.add_argument("--harvest-pages", type=int, default=3,
+                      help="Product pages to fetch per category when harvesting")
+    fetch.add_argument("--harvest-workers", type=int, default=4,
+                      help="Concurrent page requests when harvesting")
+    fetch.add_argument("--harvest-rate", type=float, default=10,
+                      help="Harvest request budget in requests per minute")
+    fetch.add_argument("--off-url", type=str, default=OFF_BASE_URL,
+                      help="Open Food Facts base URL (point at off_standin.py for offline runs)")
+    fetch.add_argument("--spoonacular-key", type=str, default=None,
+                      help="Spoonacular API key (optional, uses Open Food Facts by default)")
+    fetch.add_argument("--spoonacular-workers", type=int, default=4,
+                      help="Concurrent Spoonacular requests")
+    fetch.add_argument("--spoonacular-rate", type=float, default=1.0,
+                      help="Spoonacular request budget in requests per second (match your plan)")
+    fetch.add_argument("--http-cache-ttl", type=float, default=24,
+                      help="Hours before cached food-list responses are revalidated")
+    fetch.add_argument("--no-http-cache", action="store_true",
+                      help="Always re-download food-list responses")
+    fetch.add_argument("--offline", action="store_true",
+                      help="Serve food-list fetches purely from the HTTP cache")
+    fetch.set_defaults(handler=cmd_fetch)
+
+    generate = commands.add_parser("generate", parents=[output, http, processing],
+                                   help="Generate icons for foods in foods.json",
+                                   description="Generate icons for foods in foods.json")
+    generate.add_argument("--misses", type=str, action="append", default=[],
+                         help="Generate the most missed names from this JSONL miss log instead of foods.json (repeatable)")
+    generate.add_argument("--top", type=int, default=50,
+                         help="With --misses, how many of the most missed unresolved names to generate")
+    generate.add_argument("--jobs", type=int, default=1,
+                         help="Number of icon requests to keep in flight concurrently")
+    generate.add_argument("--adaptive", action="store_true",
+                         help="Adjust in-flight requests automatically (AIMD on 429s/latency); --jobs becomes the ceiling")
+    generate.add_argument("--batch", type=int, default=1,
+                         help=f"Foods per request, drawn as one grid image and sliced (max {MAX_BATCH})")
+    generate.add_argument("--no-hedge", action="store_true",
+                         help="Don't send a duplicate request when one runs past the model's p95 latency")
+    generate.add_argument("--breaker-failures", type=int, default=5,
+                         help="Consecutive failures before a model's circuit opens")
+    generate.add_argument("--breaker-cooldown", type=float, default=60,
+                         help="Seconds an open circuit waits before a trial request")
+    generate.add_argument("--resume", action="store_true",
+                         help="Skip items the journal already records as done")
+    generate.add_argument("--retry-failed", action="store_true",
+                         help="Only regenerate items whose last attempt failed")
+    generate.add_argument("--max-attempts", type=int, default=None,
+                         help="Stop retrying items that have failed this many times")
+    generate.add_argument("--journal", type=str, default=None,
+                         help=f"Job journal path (default: {JOURNAL_FILE.name})")
+    generate.add_argument("--metrics", type=str, default=None,
+                         help=f"Per-request metrics JSONL path (default: {METRICS_FILE.name})")
+    generate.add_argument("--prometheus-textfile", type=str, default=None,
+                         help="Also keep Prometheus metrics in this .prom file (node_exporter textfile collector)")
+    generate.add_argument("--openrouter-url", type=str, default=None,
+                         help="OpenRouter API base URL (or set OPENROUTER_BASE_URL; point at openrouter_standin.py for load tests)")
+    generate.set_defaults(handler=cmd_generate)
+
+    postprocess = commands.add_parser("postprocess", parents=[output, processing],
+                                      help="Optimize, reprocess or dedupe existing icons",
+                                      description="Optimize every PNG in the icon directory (default), "
+                                                  "rebuild icons from the raw response cache, or dedupe them")
+    mode = postprocess.add_mutually_exclusive_group()
+    mode.add_argument("--optimize", action="store_true",
+                     help="Optimize every PNG in the icon directory (default)")
+    mode.add_argument("--reprocess", action="store_true",
+                     help="Rebuild icons from the raw response cache (no network)")
+    mode.add_argument("--dedupe-icons", action="store_true",
+                     help="Report near-identical icons found by perceptual hashing")
+    postprocess.add_argument("--dedupe-radius", type=int, default=16,
+                            help="Max Hamming distance (of 256 bits) for two icons to count as duplicates")
+    postprocess.add_argument("--collapse", action="store_true",
+                            help="With --dedupe-icons, keep one icon per cluster and alias the rest")
+    postprocess.set_defaults(handler=cmd_postprocess)
+
+    publish = commands.add_parser("publish", parents=[output],
+                                  help="Build the manifest, resolver, sprite atlas and native exports and publish to the app",
+                                  description="Build publish targets from the icon directory "
+                                              "(all of them unless some are selected)")
+    publish.add_argument("--manifest", action="store_true",
+                        help=f"Write {MANIFEST_FILE} mapping resolvable names to icon files")
+    publish.add_argument("--resolver", action="store_true",
+                        help="Write resolver.json, a token index for fuzzy name -> icon lookups, and report its hit rate")
+    publish.add_argument("--atlas", action="store_true",
+                        help="Pack icons into sprite sheets with a JSON coordinate index")
+    publish.add_argument("--native", action="store_true",
+                        help="Export icons to Android drawable buckets and an iOS asset catalog")
+    publish.add_argument("--resolver-sample", type=str, default=None,
+                        help=f"Names (optionally tab + expected icon) to measure the resolver on (default: fixtures/{RESOLVER_SAMPLE.name})")
+    publish.add_argument("--web", action="store_true",
+                        help="Mirror the icon directory (and sprite sheets, under atlas/) into the app's public icons, "
+                             "copying only changed files")
+    publish.add_argument("--web-dir", type=str, default=None,
+                        help="Directory the app serves icons from (default: public/food-icons)")
+    publish.add_argument("--hashed", action="store_true",
+                        help="With --web, also publish content-hashed file names plus icon-map.json for immutable caching")
+    publish.add_argument("--atlas-dir", type=str, default=None,
+                        help=f"Output directory for sprite sheets (default: {ATLAS_DIR.name})")
+    publish.add_argument("--android-res", type=str, default=None,
+                        help="Android res/ directory for --native")
+    publish.add_argument("--ios-assets", type=str, default=None,
+                        help="iOS Assets.xcassets directory for --native")
+    publish.set_defaults(handler=cmd_publish)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not getattr(args, "handler", None):
+        parser.print_help()
+        print("\n\nExample usage:")
+        print("  1. First fetch food list:")
+        print("     python -m foodicons fetch --limit 1000")
+        print("")
+        print("  2. Then generate icons:")
+        print("     export OPENROUTER_API_KEY='your_key'")
+        print("     python -m foodicons generate --limit 100")
+        return 0
+
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
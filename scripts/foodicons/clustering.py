@@ -0,0 +1,137 @@
+"""Name clustering - collapse near-duplicate names before paying for icons."""
+
+import json
+import math
+from pathlib import Path
+
+from .config import ALIASES_FILE
+from .manifest import head_token, lookup_variations, name_tokens, normalize_name
+from .util import safe_filename
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def cluster_names(names: list[str], threshold: float = 1.0) -> list[list[int]]:
+    """
+    Group near-duplicate names. Returns clusters as lists of indexes into `names`.
+    Two names join a cluster if one reaches the other through the client's
+    plural rules (lookup_variations), or if they share a head noun and their
+    token sets have Jaccard similarity >= `threshold` ("milk chocolate" and
+    "chocolate milk" stay apart). Candidate pairs come from a prefix-filtered
+    inverted index over tokens (rarest first), so only names sharing a rare
+    token are ever compared and the join scales to 100k+ names.
+    """
+    normalized = [normalize_name(name) for name in names]
+    uf = UnionFind(len(names))
+
+    # Plural rules: exact lookups in a name -> index map
+    first_index: dict[str, int] = {}
+    for i, key in enumerate(normalized):
+        if key in first_index:
+            uf.union(first_index[key], i)
+        else:
+            first_index[key] = i
+    for i, key in enumerate(normalized):
+        for variation in lookup_variations(key)[1:]:
+            if variation in first_index:
+                uf.union(first_index[variation], i)
+
+    # Token similarity: prefix filtering over tokens ordered rarest first
+    # Same tokens as the resolver, but qualifiers count ("tuna in water" isn't just tuna)
+    token_sets = [tuple(sorted(name_tokens(key, qualifiers=True))) for key in normalized]
+    heads = [head_token(name_tokens(key)) for key in normalized]
+    frequency: dict[str, int] = {}
+    for tokens in token_sets:
+        for token in tokens:
+            frequency[token] = frequency.get(token, 0) + 1
+
+    index: dict[str, list[int]] = {}
+    for i, tokens in enumerate(token_sets):
+        if not tokens:
+            continue
+        ordered = sorted(tokens, key=lambda t: (frequency[t], t))
+        prefix_length = len(ordered) - math.ceil(threshold * len(ordered)) + 1
+        candidates = set()
+        for token in ordered[:prefix_length]:
+            candidates.update(index.get(token, ()))
+            index.setdefault(token, []).append(i)
+
+        mine = set(tokens)
+        for j in candidates:
+            other = token_sets[j]
+            if heads[i] != heads[j]:
+                continue
+            # Length filter before the exact check
+            if min(len(mine), len(other)) < threshold * max(len(mine), len(other)):
+                continue
+            if len(mine & set(other)) / len(mine | set(other)) >= threshold:
+                uf.union(i, j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(names)):
+        clusters.setdefault(uf.find(i), []).append(i)
+    return list(clusters.values())
+
+
+def cluster_foods(foods: list, icons_dir: Path, threshold: float = 1.0) -> tuple[list[dict], dict[str, str]]:
+    """
+    Collapse near-duplicate foods to one representative per cluster.
+    The representative is a member that already has an icon if there is one,
+    otherwise the most popular (then shortest) name. Returns the
+    representatives (with an "aliases" list) and an alias -> icon name map.
+    """
+    foods = [food if isinstance(food, dict) else {"name": food} for food in foods]
+    names = [food["name"] for food in foods]
+
+    representatives = []
+    aliases = {}
+    for members in sorted(cluster_names(names, threshold), key=min):
+        def preference(i: int):
+            has_icon = (icons_dir / f"{safe_filename(names[i])}.png").exists()
+            return (not has_icon, -foods[i].get("count", 0), len(names[i]), i)
+
+        best = min(members, key=preference)
+        rep = dict(foods[best])
+        others = sorted({names[i] for i in members if normalize_name(names[i]) != normalize_name(names[best])})
+        if others:
+            rep["aliases"] = others
+            for alias in others:
+                aliases[normalize_name(alias)] = safe_filename(rep["name"])
+        representatives.append(rep)
+
+    return representatives, aliases
+
+
+def drop_aliased(foods: list, aliases: dict[str, str]) -> list:
+    """Foods whose name isn't an alias of another icon (those never need drawing)."""
+    def aliased(food) -> bool:
+        name = food["name"] if isinstance(food, dict) else food
+        return any(aliases.get(key, key) != key for key in (normalize_name(name), safe_filename(name)))
+
+    return [food for food in foods if not aliased(food)]
+
+
+def load_aliases(path: Path = ALIASES_FILE) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_aliases(aliases: dict[str, str], path: Path = ALIASES_FILE) -> None:
+    with open(path, "w") as f:
+        json.dump(dict(sorted(aliases.items())), f, indent=2)
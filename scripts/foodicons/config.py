@@ -0,0 +1,63 @@
+"""
+Paths and settings shared by every subcommand.
+Kept free of third-party imports so the CLI can start without loading them.
+"""
+
+import os
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+FOODS_FILE = SCRIPT_DIR / "foods.json"
+JOURNAL_FILE = SCRIPT_DIR / "foods.journal.jsonl"
+METRICS_FILE = SCRIPT_DIR / "foods.metrics.jsonl"
+CACHE_DIR = SCRIPT_DIR / ".icon_cache"
+HTTP_CACHE_DIR = SCRIPT_DIR / ".http_cache"
+ICONS_DIR = SCRIPT_DIR / "food_icons"
+ALIASES_FILE = SCRIPT_DIR / "aliases.json"
+ENV_FILE = SCRIPT_DIR / ".env"
+
+# Food list fetching
+OFF_BASE_URL = "https://world.openfoodfacts.org"
+
+# Icon generation
+ICON_MODEL = "google/gemini-2.5-flash-image"
+# Override with OPENROUTER_BASE_URL to point generate at openrouter_standin.py
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+ICON_SIZE = 64
+NATIVE_SIZE = 32  # Resolution the prompt asks the model to draw at
+MAX_BATCH = 16
+
+# Publishing
+ATLAS_DIR = SCRIPT_DIR / "food_icons_atlas"
+ATLAS_INDEX = "atlas.json"
+MANIFEST_FILE = "manifest.json"
+RESOLVER_SAMPLE = SCRIPT_DIR / "fixtures" / "resolver_sample.tsv"
+REPO_DIR = SCRIPT_DIR.parent
+PUBLIC_ICONS_DIR = REPO_DIR / "public" / "food-icons"
+ANDROID_RES_DIR = REPO_DIR / "android" / "app" / "src" / "main" / "res"
+IOS_ASSETS_DIR = REPO_DIR / "ios" / "App" / "App" / "Assets.xcassets"
+NATIVE_EXPORT_STATE = SCRIPT_DIR / ".native_export.json"
+IOS_ICON_FOLDER = "FoodIcons"
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load .env file if exists (once; only subcommands that need API keys call this)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    if ENV_FILE.exists():
+        with open(ENV_FILE) as f:
+            for line in f:
+                if "=" in line and not line.startswith("#"):
+                    key, value = line.strip().split("=", 1)
+                    os.environ[key] = value
+
+
+def openrouter_base_url() -> str:
+    """OpenRouter API base URL, honoring OPENROUTER_BASE_URL from the environment or .env."""
+    load_env()
+    return os.environ.get("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL)
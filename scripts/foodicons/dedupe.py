@@ -0,0 +1,115 @@
+"""Perceptual dedupe - find near-identical icons with a BK-tree."""
+
+from pathlib import Path
+
+from PIL import Image
+
+
+HASH_BACKGROUND = (250, 249, 246)  # The prompt's #FAF9F6 background
+
+
+def dhash(img: Image.Image, hash_size: int = 16) -> int:
+    """
+    Difference hash: compare neighbouring pixels of a small grayscale copy.
+    Transparent pixels are flattened onto the icon background first.
+    The default 16x16 (256-bit) hash is used because 64-bit hashes of
+    small pixel-art icons on a shared background collide too easily.
+    """
+    rgba = img.convert("RGBA")
+    flat = Image.new("RGB", rgba.size, HASH_BACKGROUND)
+    flat.paste(rgba, mask=rgba.getchannel("A"))
+    small = flat.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance for radius queries on hashes."""
+
+    def __init__(self):
+        self.root = None  # (hash, items, children by distance)
+
+    def add(self, value: int, item) -> None:
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list:
+        """All items whose hash is within `radius` bits of `value`."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = (node[0] ^ value).bit_count()
+            if distance <= radius:
+                found.extend(node[1])
+            # Triangle inequality: only subtrees in [d - r, d + r] can match
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+def find_duplicate_icons(icons_dir: Path, radius: int = 16) -> list[list[str]]:
+    """
+    Cluster icons whose perceptual hashes are within `radius` bits of a
+    cluster's first icon. Only cluster leaders go into the BK-tree, so every
+    member is close to its leader and clusters can't chain across the set.
+    Returns clusters of 2+ names.
+    """
+    names = sorted(path.stem for path in icons_dir.glob("*.png"))
+    hashes = {name: dhash(Image.open(icons_dir / f"{name}.png")) for name in names}
+
+    leaders = BKTree()
+    clusters: dict[str, list[str]] = {}
+    for name in names:
+        matches = leaders.search(hashes[name], radius)
+        if matches:
+            nearest = min(matches, key=lambda leader: (hashes[leader] ^ hashes[name]).bit_count())
+            clusters[nearest].append(name)
+        else:
+            leaders.add(hashes[name], name)
+            clusters[name] = [name]
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def collapse_duplicate_icons(icons_dir: Path, clusters: list[list[str]],
+                             aliases: dict[str, str]) -> int:
+    """
+    Keep one icon per cluster (the shortest name), delete the rest and point
+    their names at the survivor in `aliases`. Returns files removed.
+    """
+    removed = 0
+    for members in clusters:
+        keep = min(members, key=lambda name: (len(name), name))
+        for name in members:
+            if name == keep:
+                continue
+            (icons_dir / f"{name}.png").unlink(missing_ok=True)
+            aliases[name] = keep
+            removed += 1
+    # Aliases that pointed at a removed icon follow it to the survivor
+    for alias, icon in aliases.items():
+        seen = {alias}
+        while icon in aliases and icon not in seen:
+            seen.add(icon)
+            icon = aliases[icon]
+        aliases[alias] = icon
+    return removed
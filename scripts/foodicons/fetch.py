@@ -0,0 +1,280 @@
+"""Food list fetching from Open Food Facts and Spoonacular."""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from .config import OFF_BASE_URL
+from .net import HttpClient, TokenBucket, get_http_client, retry_note
+from .util import log
+
+
+OFF_SKIP_CATEGORY_WORDS = ["brand", "store", "country", "label", "packaging"]
+OFF_SKIP_NAME_WORDS = ["e1", "e2", "e3", "e4", "e5", "e6", "e7", "e8", "e9", "acid", "extract"]
+
+
+class FoodRanker:
+    """
+    Streaming dedupe + popularity ranking for fetched food names.
+    Keeps the highest count seen per name; ties keep the first food added.
+    """
+
+    def __init__(self):
+        self.foods: dict[str, dict] = {}
+
+    def add(self, food: dict) -> None:
+        current = self.foods.get(food["name"])
+        if current is None or food.get("count", 0) > current.get("count", 0):
+            self.foods[food["name"]] = food
+
+    def __len__(self) -> int:
+        return len(self.foods)
+
+    def ranked(self, limit: int | None = None) -> list[dict]:
+        """Foods sorted by popularity, most popular first (ties by name, so runs are repeatable)."""
+        ranked = sorted(self.foods.values(), key=lambda x: (-x.get("count", 0), x["name"]))
+        return ranked[:limit]
+
+
+def clean_off_name(name: str, max_length: int = 30) -> str | None:
+    """Normalize an Open Food Facts name, or None if it isn't a usable food name."""
+    name = (name or "").strip().lower()
+    if len(name) <= 2 or len(name) >= max_length:
+        return None
+    if any(skip in name for skip in OFF_SKIP_NAME_WORDS):
+        return None
+    return name
+
+
+def harvest_off_products(categories: list[dict], client: HttpClient, base_url: str = OFF_BASE_URL,
+                         pages: int = 3, page_size: int = 100, workers: int = 4,
+                         rate: float = 10 / 60):
+    """
+    Walk the product pages of each category concurrently and yield
+    (product name, category id) as each page arrives.
+    A bounded pool of `workers` fetches pages; a shared token bucket keeps
+    the whole harvest under `rate` requests per second (OFF asks search API
+    clients to stay under 10 requests/minute). Page 1 of each category
+    tells us how many more pages to queue, up to `pages`.
+    Closing the generator early cancels any pages not yet fetched.
+    """
+    limiter = TokenBucket(rate)
+
+    def fetch_page(category_id: str, page: int):
+        response = client.cached_get(f"{base_url}/api/v2/search", params={
+            "categories_tags": category_id,
+            "fields": "product_name",
+            "page": page,
+            "page_size": page_size,
+        }, limiter=limiter)
+        return category_id, page, response
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        pending = {executor.submit(fetch_page, cat["id"], 1) for cat in categories}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    category_id, page, response = future.result()
+                except requests.RequestException as e:
+                    log(f"  Error: {e}")
+                    continue
+                if response.status_code != 200:
+                    log(f"  Failed: {category_id} page {page} (status {response.status_code}){retry_note(response)}")
+                    continue
+
+                data = response.json()
+                products = data.get("products", [])
+                log(f"  {category_id} page {page}: {len(products)} products{retry_note(response)}")
+
+                if page == 1:
+                    page_count = min(pages, -(-data.get("count", 0) // page_size))
+                    for next_page in range(2, page_count + 1):
+                        pending.add(executor.submit(fetch_page, category_id, next_page))
+
+                for product in products:
+                    yield product.get("product_name", ""), category_id
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_foods_from_open_food_facts(limit: int = 1000, client: HttpClient | None = None,
+                                     base_url: str = OFF_BASE_URL, harvest: bool = False,
+                                     harvest_pages: int = 3, harvest_workers: int = 4,
+                                     harvest_rate: float = 10 / 60) -> list[dict]:
+    """
+    Fetch popular food categories and items from Open Food Facts.
+    With `harvest`, also walks the product pages of the popular categories
+    and ranks product names by how many products share them.
+    Returns list of {name, category} dicts.
+    """
+    print("Fetching food categories from Open Food Facts...")
+
+    client = client or get_http_client()
+
+    ranker = FoodRanker()
+
+    # Get top categories
+    categories_url = f"{base_url}/categories.json"
+    response = client.cached_get(categories_url)
+
+    if response.status_code != 200:
+        print(f"Failed to fetch categories: {response.status_code}{retry_note(response)}")
+        return []
+
+    categories = response.json().get("tags", [])
+    print(f"Found {len(categories)} categories{retry_note(response)}")
+
+    # Filter to food-related categories and get names
+    food_categories = []
+    for cat in categories[:200]:  # Top 200 categories
+        name = cat.get("name", "")
+        # Skip non-food categories
+        if any(skip in name.lower() for skip in OFF_SKIP_CATEGORY_WORDS):
+            continue
+        if cat.get("products", 0) > 100:  # Only popular categories
+            food_categories.append({
+                "name": name,
+                "id": cat.get("id", ""),
+                "count": cat.get("products", 0)
+            })
+
+    print(f"Filtered to {len(food_categories)} food categories")
+
+    # Now get individual food items from popular categories
+    print("\nFetching individual food items...")
+
+    # Also get ingredients which are more specific
+    ingredients_url = f"{base_url}/ingredients.json"
+    response = client.cached_get(ingredients_url)
+
+    if response.status_code != 200:
+        print(f"Failed to fetch ingredients: {response.status_code}{retry_note(response)}")
+    elif response.retries:
+        print(f"Fetched ingredients{retry_note(response)}")
+
+    if response.status_code == 200:
+        ingredients = response.json().get("tags", [])
+        for ing in ingredients[:500]:  # Top 500 ingredients
+            name = clean_off_name(ing.get("name", ""))
+            if name:
+                ranker.add({
+                    "name": name,
+                    "category": "ingredient",
+                    "count": ing.get("products", 0)
+                })
+
+    # Add category names as foods too (they're often good food names)
+    for cat in food_categories:
+        name = cat["name"].strip().lower()
+        if len(name) > 2 and len(name) < 25:
+            ranker.add({
+                "name": name,
+                "category": "category",
+                "count": cat["count"]
+            })
+
+    if harvest:
+        print(f"\nHarvesting products from {len(food_categories)} categories "
+              f"({harvest_workers} workers, {harvest_rate * 60:.0f} requests/min)...")
+        product_counts: dict[str, int] = {}
+        for product_name, category_id in harvest_off_products(
+                food_categories, client, base_url, pages=harvest_pages,
+                workers=harvest_workers, rate=harvest_rate):
+            name = clean_off_name(product_name)
+            if name:
+                product_counts[name] = product_counts.get(name, 0) + 1
+                ranker.add({"name": name, "category": "product", "count": product_counts[name]})
+        print(f"Harvested {len(product_counts)} distinct product names")
+
+    # Sort by popularity and limit to requested amount
+    unique_foods = ranker.ranked(limit)
+
+    print(f"\nCollected {len(unique_foods)} unique food items")
+    return unique_foods
+
+
+SPOONACULAR_URL = "https://api.spoonacular.com/food/ingredients/search"
+SPOONACULAR_PAGE_SIZE = 100  # Max results per request
+SPOONACULAR_MAX_OFFSET = 900  # The search endpoint rejects larger offsets
+
+
+def fetch_foods_from_spoonacular(api_key: str, limit: int = 1000,
+                                 client: HttpClient | None = None,
+                                 workers: int = 4, rate: float = 1.0,
+                                 base_url: str = SPOONACULAR_URL) -> list[dict]:
+    """
+    Fetch ingredients from Spoonacular API.
+    Requires API key from https://spoonacular.com/food-api
+    Queries every letter of the alphabet concurrently and follows each one
+    through its result pages by offset. A token bucket keeps requests under
+    `rate` per second to match the plan quota. Names are deduped as they
+    arrive and outstanding requests are cancelled once `limit` unique names
+    are collected.
+    """
+    print("Fetching foods from Spoonacular...")
+
+    client = client or get_http_client()
+    limiter = TokenBucket(rate)
+    done = threading.Event()
+
+    def fetch_page(letter: str, offset: int):
+        if done.is_set():
+            return letter, offset, None
+        response = client.cached_get(base_url, params={
+            "query": letter,
+            "number": SPOONACULAR_PAGE_SIZE,
+            "offset": offset,
+            "apiKey": api_key
+        }, limiter=limiter)
+        return letter, offset, response
+
+    seen = set()
+    unique_foods = []
+
+    # Search through alphabet to get variety
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        pending = {executor.submit(fetch_page, letter, 0) for letter in "abcdefghijklmnopqrstuvwxyz"}
+        while pending and not done.is_set():
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                try:
+                    letter, offset, response = future.result()
+                except requests.RequestException as e:
+                    print(f"  Error: {e}")
+                    continue
+                if response is None:
+                    continue
+                if response.status_code != 200:
+                    print(f"  Failed: '{letter}' offset {offset} (status {response.status_code}){retry_note(response)}")
+                    continue
+                elif response.retries:
+                    print(f"  Fetched '{letter}' offset {offset}{retry_note(response)}")
+
+                data = response.json()
+                next_offset = offset + SPOONACULAR_PAGE_SIZE
+                if next_offset < data.get("totalResults", 0) and next_offset <= SPOONACULAR_MAX_OFFSET:
+                    pending.add(executor.submit(fetch_page, letter, next_offset))
+
+                for item in data.get("results", []):
+                    name = item.get("name", "").lower()
+                    if name and name not in seen:
+                        seen.add(name)
+                        unique_foods.append({
+                            "name": name,
+                            "category": "ingredient",
+                            "id": item.get("id")
+                        })
+                if len(unique_foods) >= limit:
+                    done.set()
+                    break
+    finally:
+        # Drop queued pages; in-flight ones finish and are ignored
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if done.is_set():
+        print(f"Reached {limit} unique foods, cancelled remaining requests")
+    return unique_foods[:limit]
@@ -0,0 +1,194 @@
+"""Curated food list - visually distinct grocery items only."""
+
+CURATED_FOODS = {
+    "fruits": [
+        "apple", "banana", "orange", "lemon", "lime", "grapefruit", "tangerine",
+        "strawberry", "blueberry", "raspberry", "blackberry", "grape", "cherry",
+        "watermelon", "cantaloupe", "honeydew", "mango", "papaya", "pineapple", "coconut",
+        "kiwi", "peach", "nectarine", "plum", "apricot", "pear", "pomegranate", "fig",
+        "passion fruit", "dragon fruit", "avocado", "cranberry", "dates", "raisins",
+        "plantain", "starfruit", "jackfruit"
+    ],
+    "vegetables": [
+        "carrot", "broccoli", "cauliflower", "cabbage", "lettuce", "spinach", "kale",
+        "brussels sprouts", "asparagus", "celery",
+        "cucumber", "zucchini", "butternut squash", "pumpkin", "spaghetti squash",
+        "eggplant", "bell pepper", "jalapeno", "habanero",
+        "onion", "green onion", "leek", "garlic", "ginger",
+        "potato", "sweet potato", "yukon gold potato",
+        "beet", "turnip", "radish", "parsnip",
+        "corn", "peas", "green beans", "edamame", "snap peas",
+        "artichoke", "mushroom", "bok choy", "bean sprouts",
+        "tomato", "cherry tomato", "roma tomato"
+    ],
+    "herbs_spices": [
+        "basil", "oregano", "thyme", "rosemary", "mint", "cilantro", "parsley",
+        "dill", "chives", "bay leaf",
+        "cinnamon stick", "vanilla bean", "black pepper", "salt"
+    ],
+    "dairy": [
+        "milk", "almond milk", "oat milk",
+        "butter", "cream cheese", "sour cream", "whipped cream",
+        "cheddar cheese", "mozzarella", "parmesan", "brie", "feta", "blue cheese",
+        "cottage cheese", "shredded cheese", "string cheese",
+        "yogurt", "greek yogurt",
+        "coffee creamer", "half and half", "cool whip"
+    ],
+    "eggs": [
+        "egg", "hard boiled egg"
+    ],
+    "meat": [
+        "chicken breast", "chicken wing", "whole chicken", "rotisserie chicken",
+        "turkey", "duck",
+        "ground beef", "steak", "beef roast", "brisket",
+        "pork chop", "pork roast",
+        "bacon", "ham", "pork belly", "ribs",
+        "sausage", "hot dog", "pepperoni", "salami", "prosciutto",
+        "deli meat", "cheese slices",
+        "lamb chop", "meatballs"
+    ],
+    "seafood": [
+        "salmon", "smoked salmon", "tuna", "cod", "tilapia", "trout",
+        "sardine", "mackerel",
+        "shrimp", "lobster", "crab",
+        "scallop", "clam", "mussel", "oyster", "squid", "octopus",
+        "fish fillet"
+    ],
+    "bread_bakery": [
+        "bread loaf", "baguette", "sourdough", "brioche",
+        "pita bread", "naan", "tortilla", "flatbread",
+        "bagel", "english muffin", "croissant", "muffin",
+        "donut", "cinnamon roll", "pretzel", "hamburger bun", "hot dog bun",
+        "cornbread", "biscuit", "dinner roll", "breadsticks"
+    ],
+    "grains_pasta": [
+        "rice", "quinoa", "couscous", "barley", "oatmeal",
+        "spaghetti", "penne", "macaroni", "lasagna", "ravioli", "tortellini",
+        "ramen", "udon",
+        "cereal box", "cheerios", "granola", "corn flakes",
+        "flour bag", "cornmeal", "pancake mix", "waffle"
+    ],
+    "canned_goods": [
+        "canned tomatoes", "tomato sauce", "tomato paste",
+        "canned corn", "canned beans",
+        "canned tuna", "canned soup", "chicken broth", "beef broth",
+        "canned peaches", "canned pineapple", "fruit cocktail", "coconut milk",
+        "olives", "pickles", "sauerkraut",
+        "roasted red peppers", "artichoke hearts", "sun dried tomatoes", "capers",
+        "condensed milk", "evaporated milk"
+    ],
+    "legumes": [
+        "black beans", "kidney beans", "pinto beans", "white beans", "chickpeas", "lentils",
+        "hummus", "tofu", "tempeh", "bean dip"
+    ],
+    "nuts_seeds": [
+        "almonds", "walnuts", "pecans", "cashews", "pistachios", "peanuts",
+        "sunflower seeds", "pumpkin seeds", "chia seeds",
+        "peanut butter", "almond butter", "nutella"
+    ],
+    "condiments_sauces": [
+        "ketchup", "mustard", "mayonnaise",
+        "hot sauce", "sriracha",
+        "soy sauce", "teriyaki sauce", "hoisin sauce",
+        "bbq sauce", "salsa", "guacamole", "salsa verde", "queso",
+        "ranch dressing", "vinaigrette", "caesar dressing",
+        "marinara sauce", "alfredo sauce", "pesto",
+        "vinegar", "olive oil", "vegetable oil",
+        "relish", "tartar sauce", "cocktail sauce", "horseradish", "worcestershire sauce"
+    ],
+    "sweeteners_spreads": [
+        "sugar", "brown sugar", "powdered sugar",
+        "honey", "maple syrup", "molasses",
+        "jam", "jelly", "marmalade",
+        "chocolate syrup", "caramel sauce"
+    ],
+    "beverages": [
+        "water bottle", "sparkling water", "coconut water",
+        "orange juice", "apple juice", "lemonade", "grape juice", "cranberry juice",
+        "coffee cup", "coffee beans", "tea bag", "iced tea", "hot chocolate",
+        "cola", "sprite", "ginger ale", "root beer", "dr pepper", "mountain dew",
+        "energy drink", "gatorade", "vitamin water",
+        "milk carton", "chocolate milk", "milkshake",
+        "beer bottle", "wine bottle", "champagne", "whiskey", "vodka",
+        "smoothie", "protein shake", "juice box"
+    ],
+    "snacks": [
+        "potato chips", "tortilla chips", "doritos", "popcorn",
+        "pretzels", "crackers", "goldfish crackers", "rice cakes",
+        "granola bar", "trail mix", "beef jerky", "cheese puffs",
+        "chocolate bar", "m&ms", "skittles", "gummy bears",
+        "oreos", "cookies",
+        "fruit snacks", "applesauce cup", "pudding cup",
+        "dried mango", "banana chips", "veggie straws", "cheez-its",
+        "twix", "snickers", "kit kat", "reeses"
+    ],
+    "frozen": [
+        "frozen pizza", "frozen vegetables",
+        "french fries", "tater tots", "hash browns",
+        "chicken nuggets", "fish sticks",
+        "frozen dinner", "frozen burrito", "hot pockets",
+        "ice cream", "popsicle", "ice cream sandwich",
+        "frozen waffles", "frozen fruit", "frozen berries", "frozen pie",
+        "dumplings", "spring rolls", "empanadas", "egg rolls"
+    ],
+    "convenience": [
+        "mac and cheese box", "instant noodles", "cup noodles",
+        "pizza", "microwave meal", "lunchables",
+        "salad bag", "salad kit", "coleslaw", "soup cup",
+        "egg bites", "burrito bowl", "sushi tray"
+    ],
+    "breakfast": [
+        "pop tarts", "toaster strudel", "sandwich",
+        "pancakes", "waffles", "french toast",
+        "omelette", "scrambled eggs", "bacon strips",
+        "breakfast burrito", "breakfast sandwich"
+    ],
+    "baking": [
+        "vanilla extract", "baking powder", "yeast",
+        "chocolate chips", "cocoa powder",
+        "cake mix", "pie crust",
+        "frosting", "sprinkles"
+    ],
+    "international": [
+        "sushi", "wasabi", "nori", "soy sauce bottle",
+        "kimchi", "miso paste", "tofu block",
+        "curry paste", "taco shells", "enchilada sauce", "refried beans",
+        "falafel", "tzatziki", "pita chips",
+        "rice paper", "wonton wrappers", "fortune cookie",
+        "pad thai", "ramen bowl", "pho"
+    ],
+    "baby": [
+        "baby food jar", "baby formula"
+    ],
+    "pet": [
+        "dog food", "cat food"
+    ],
+    "generic": [
+        "fruit", "vegetable", "salad", "herbs",
+        "milk", "cheese", "butter", "yogurt", "cream",
+        "egg",
+        "meat", "chicken", "beef", "pork", "fish", "seafood",
+        "bread", "bun", "roll",
+        "rice", "pasta", "noodles", "grain", "cereal",
+        "beans", "nuts",
+        "sauce", "dressing", "condiment", "oil", "vinegar",
+        "sugar", "honey", "syrup", "jam", "spread",
+        "juice", "soda", "coffee", "tea", "water", "drink", "alcohol",
+        "chips", "crackers", "cookies", "candy", "chocolate", "snack",
+        "frozen food", "pizza", "ice cream",
+        "soup", "broth", "canned food",
+        "baking", "flour", "spices",
+        "baby food", "pet food",
+        "leftovers", "takeout container", "meal prep", "lunch box",
+        "grocery bag", "food", "other food"
+    ]
+}
+
+
+def get_curated_foods() -> list[dict]:
+    """Get flattened curated food list."""
+    foods = []
+    for category, items in CURATED_FOODS.items():
+        for item in items:
+            foods.append({"name": item, "category": category})
+    return foods
@@ -0,0 +1,603 @@
+"""Icon generation - prompts, model requests, fallback routing and batches."""
+
+import time
+import base64
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from .cache import RawCache
+from .config import ICON_MODEL, OPENROUTER_BASE_URL
+from .imaging import ProcessOptions, batch_grid_shape, process_icon_image, save_icon, slice_icon_grid
+from .net import AdaptiveConcurrency, HttpClient, get_http_client, retry_note
+from .util import log, safe_filename
+
+
+ICON_STYLE = """Style:
+- Cozy, warm pixel art style (32x32 pixels)
+- Soft, friendly colors - not too saturated
+- Warm cream/off-white background (#FAF9F6)
+- Simple but charming - like a cozy indie game
+- Slight hand-drawn imperfect feel
+- Small subtle highlight to give it life
+- NO face or expressions
+- NO text
+
+Color palette inspiration:
+- Greens: soft sage (#A7F3D0), emerald (#059669)
+- Warm accents: terracotta (#D97706), coral (#DC6B5A)
+- Browns: warm brown (#92400E)
+
+Make it look appetizing and friendly, like it belongs in a cozy kitchen app."""
+
+
+def icon_prompt(food_name: str) -> str:
+    """Build the image generation prompt for a food."""
+    return f"""Generate a simple pixel art icon of "{food_name}".
+
+{ICON_STYLE}"""
+
+
+def batch_prompt(food_names: list[str], cols: int, rows: int) -> str:
+    """Prompt for one image holding a cols x rows grid of icons (see generate_icon_batch)."""
+    items = "\n".join(f"{i}. {name}" for i, name in enumerate(food_names, 1))
+    empty = "\n- Leave the remaining cells empty" if cols * rows > len(food_names) else ""
+    return f"""Generate a {cols}x{rows} grid of separate pixel art icons, one food per cell, in reading order (left to right, top to bottom):
+{items}
+
+Layout:
+- Split the image into {cols} equal columns and {rows} equal rows
+- Center each icon in its cell with a wide empty margin; icons must not touch or overlap
+- NO grid lines, borders, numbers or labels{empty}
+
+Every icon uses the same style:
+{ICON_STYLE}"""
+
+
+@dataclass
+class IconResult:
+    """Outcome of generating a single icon."""
+    name: str
+    status: str  # "generated", "skipped" or "failed"
+    latency: float = 0.0
+    retries: int = 0
+    error: str | None = None
+    sha256: str | None = None
+    # Per-request measurements, see RunMetrics
+    queue_wait: float = 0.0
+    http_time: float = 0.0
+    process_time: float = 0.0
+    response_bytes: int = 0
+    output_bytes: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    model: str | None = None
+    hedged: bool = False
+    # Full HTTP time of each request this result made; a batch request is
+    # listed once, on its first icon, while http_time holds each icon's share
+    request_times: list[float] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+    def charge(self, attempts: list["ImageAttempt"], share: int = 1, requests: bool = True) -> None:
+        """
+        Add what `attempts` cost to this result: a 1/`share` part of their
+        HTTP time, bytes, tokens and cost, plus (with `requests`) their
+        retries and one request_times entry each, so every request is
+        counted by exactly one result.
+        """
+        self.http_time += sum(a.http_time for a in attempts) / share
+        self.response_bytes += sum(a.response_bytes for a in attempts) // share
+        self.prompt_tokens += sum(a.prompt_tokens for a in attempts) // share
+        self.completion_tokens += sum(a.completion_tokens for a in attempts) // share
+        self.cost += sum(a.cost for a in attempts) / share
+        if requests:
+            self.retries += sum(a.retries for a in attempts)
+            self.request_times.extend(a.http_time for a in attempts)
+
+
+def message_image(message: dict) -> bytes | None:
+    """Decode the first data-URL image in a chat completion message, if any."""
+    # Check for images array (Gemini format)
+    for img_obj in message.get("images", []):
+        if img_obj.get("type") == "image_url":
+            img_url = img_obj.get("image_url", {}).get("url", "")
+            if img_url.startswith("data:image"):
+                # Extract base64 from data URL
+                return base64.b64decode(img_url.split(",")[1])
+    return None
+
+
+@dataclass
+class ImageAttempt:
+    """One chat completion request for an image, successful if img_bytes is set."""
+    model: str
+    img_bytes: bytes | None = None
+    error: str | None = None
+    retries: int = 0
+    http_time: float = 0.0
+    decode_time: float = 0.0
+    response_bytes: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.img_bytes is not None
+
+
+def request_image(prompt: str, model: str, api_key: str, client: HttpClient,
+                  base_url: str = OPENROUTER_BASE_URL,
+                  concurrency: AdaptiveConcurrency | None = None) -> ImageAttempt:
+    """
+    Ask `model` for an image. Never raises: failures (HTTP errors, malformed
+    payloads, undecodable images) come back as attempt.error.
+    """
+    attempt = ImageAttempt(model)
+    start = time.monotonic()
+    try:
+        response = client.post(
+            f"{base_url}/chat/completions",
+            concurrency=concurrency,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://nowaste-ai.web.app",
+                "X-Title": "No Waste AI",
+            },
+            json={
+                "model": model,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    }
+                ],
+                "usage": {"include": True},  # Token counts and cost in the response
+            }
+        )
+        attempt.http_time = time.monotonic() - start
+        attempt.retries = getattr(response, "retries", 0)
+        attempt.response_bytes = len(response.content)
+
+        if response.status_code != 200:
+            error_text = response.text[:300] if response.text else "No error message"
+            attempt.error = f"status {response.status_code}: {error_text}"
+            return attempt
+
+        data = response.json()
+        usage = data.get("usage") or {}
+        attempt.prompt_tokens = usage.get("prompt_tokens") or 0
+        attempt.completion_tokens = usage.get("completion_tokens") or 0
+        attempt.cost = float(usage.get("cost") or 0)
+
+        # Check for image in response
+        choices = data.get("choices", [])
+        if not choices:
+            attempt.error = "no choices"
+            return attempt
+
+        decode_start = time.monotonic()
+        img_bytes = message_image(choices[0].get("message", {}))
+        if img_bytes is None:
+            attempt.error = "no image in response"
+            return attempt
+        Image.open(BytesIO(img_bytes)).verify()
+        attempt.decode_time = time.monotonic() - decode_start
+        attempt.img_bytes = img_bytes
+    except Exception as e:
+        attempt.http_time = attempt.http_time or time.monotonic() - start
+        attempt.error = str(e) or type(e).__name__
+    return attempt
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one model.
+    After `threshold` failures in a row the circuit opens and the model gets
+    no traffic for `cooldown` seconds. Then a single trial request is let
+    through (half-open); its outcome closes the circuit or re-opens it.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._trial else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._trial and time.monotonic() - self._opened_at >= self.cooldown:
+                self._trial = True
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self._opened_at = None
+                self._trial = False
+                return
+            self.failures += 1
+            if self._trial or (self._opened_at is None and self.failures >= self.threshold):
+                self._opened_at = time.monotonic()
+                self._trial = False
+                self.trips += 1
+
+
+class ModelRouter:
+    """
+    Ordered list of image models with a circuit breaker each.
+    request() tries the first model whose circuit allows traffic and falls
+    through the list on failure. Once a model has `hedge_min_samples`
+    successful latencies, an attempt still running at that model's p95 gets
+    a hedged duplicate and the first valid image wins; the loser is left to
+    finish in the background; its cost is tallied in hedge_cost and the
+    finished attempt goes to the router's `on_loser` (e.g. RunMetrics) and,
+    if it holds a valid image, to the request's `on_loser`.
+    Hedged attempts run on daemon threads, so a hung loser never holds up
+    interpreter exit; close() stops new hedges.
+    """
+
+    HEDGE_TAG = "+hedge"  # Cache keys of losing hedge images use model + HEDGE_TAG
+
+    def __init__(self, models: list[str] | tuple[str, ...] = (ICON_MODEL,), hedge: bool = True,
+                 breaker_threshold: int = 5, breaker_cooldown: float = 60.0,
+                 hedge_min_samples: int = 20, window: int = 200, max_in_flight: int = 16,
+                 on_loser=None):
+        self.models = list(models)
+        self.on_loser = on_loser
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breakers = {model: CircuitBreaker(breaker_threshold, breaker_cooldown) for model in self.models}
+        self.latencies = {model: deque(maxlen=window) for model in self.models}
+        self.outcomes = {model: {"ok": 0, "failed": 0} for model in self.models}
+        self.hedges = 0
+        self.hedges_won = 0
+        self.hedge_cost = 0.0
+        self.fallbacks = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight * 2)
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def choose(self, exclude: list[str] = ()) -> str | None:
+        """First model not in `exclude` whose circuit lets a request through."""
+        for model in self.models:
+            if model not in exclude and self.breakers[model].allow():
+                return model
+        return None
+
+    def hedge_delay(self, model: str) -> float | None:
+        """p95 of the model's recent successful latencies, once there are enough."""
+        with self._lock:
+            samples = sorted(self.latencies[model])
+        if not self.hedge or len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def record(self, attempt: ImageAttempt) -> None:
+        self.breakers[attempt.model].record(attempt.ok)
+        with self._lock:
+            self.outcomes[attempt.model]["ok" if attempt.ok else "failed"] += 1
+            if attempt.ok:
+                self.latencies[attempt.model].append(attempt.http_time)
+
+    def close(self) -> None:
+        """Stop hedging; attempts still running are abandoned when the interpreter exits."""
+        self._closed = True
+
+    def request(self, send, hedge: bool = True,
+                on_loser=None) -> tuple[ImageAttempt, bool, list[ImageAttempt]]:
+        """
+        Run `send(model) -> ImageAttempt` down the fallback chain.
+        `on_loser(attempt)` is called (from a background thread) with any
+        valid image a losing hedge returns after the winner.
+        Returns the winning (or last failed) attempt, whether it was hedged
+        and every attempt that finished before this returned (failed
+        fallbacks and hedges included), for cost and request accounting.
+        """
+        tried = []
+        attempts = []
+        last = None
+        while (model := self.choose(tried)) is not None:
+            if tried:
+                with self._lock:
+                    self.fallbacks += 1
+            tried.append(model)
+            if hedge:
+                attempt, hedged, made = self._hedged(send, model, on_loser)
+            else:
+                attempt, hedged = self._run(send, model), False
+                made = [attempt]
+            attempts += made
+            if attempt.ok:
+                return attempt, hedged, attempts
+            last = attempt
+        if last is None:
+            last = ImageAttempt(self.models[0], error="all models unavailable (circuit open)")
+        return last, False, attempts
+
+    def _run(self, send, model: str) -> ImageAttempt:
+        attempt = send(model)
+        self.record(attempt)
+        return attempt
+
+    def _spawn(self, send, model: str) -> Future | None:
+        """Run one attempt on a daemon thread, or None if closed or too many are in flight."""
+        if self._closed or not self._slots.acquire(blocking=False):
+            return None
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self._run(send, model))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._slots.release()
+
+        threading.Thread(target=run, name=f"hedge-{model}", daemon=True).start()
+        return future
+
+    def _hedged(self, send, model: str, on_loser=None) -> tuple[ImageAttempt, bool, list[ImageAttempt]]:
+        delay = self.hedge_delay(model)
+        primary = self._spawn(send, model) if delay is not None else None
+        if primary is None:
+            attempt = self._run(send, model)
+            return attempt, False, [attempt]
+        done, _ = wait([primary], timeout=delay)
+        if done or (hedge := self._spawn(send, model)) is None:
+            attempt = primary.result()
+            return attempt, False, [attempt]
+
+        with self._lock:
+            self.hedges += 1
+        pending = {primary, hedge}
+        attempts = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempts.append(future.result())
+            winner = next((future for future in done if future.result().ok), None)
+            if winner is not None:
+                with self._lock:
+                    self.hedges_won += winner is hedge
+                for loser in pending:
+                    loser.add_done_callback(lambda future: self._tally_loser(future, on_loser))
+                return winner.result(), True, attempts
+        return attempts[-1], True, attempts
+
+    def _tally_loser(self, future, on_loser=None) -> None:
+        if future.exception() is not None:
+            return
+        attempt = future.result()
+        with self._lock:
+            self.hedge_cost += attempt.cost
+        if self.on_loser is not None:
+            self.on_loser(attempt)
+        if attempt.ok and on_loser is not None:
+            on_loser(attempt)
+
+    def cached(self, cache: "RawCache | None", prompt: str, name: str) -> bytes | None:
+        """Raw image for this prompt from any of the models, in order, then from losing hedges."""
+        if cache is None:
+            return None
+        for model in self.models + [model + self.HEDGE_TAG for model in self.models]:
+            data = cache.get(RawCache.key(model, prompt, name))
+            if data is not None:
+                return data
+        return None
+
+    def summary(self) -> str:
+        parts = []
+        for model in self.models:
+            outcome = self.outcomes[model]
+            parts.append(f"{model} {outcome['ok']} ok/{outcome['failed']} failed "
+                         f"({self.breakers[model].state}, {self.breakers[model].trips} trips)")
+        line = "Models: " + "; ".join(parts)
+        line += f"\nHedging: {self.hedges} hedges, {self.hedges_won} won by the hedge, {self.fallbacks} fallbacks"
+        if self.hedge_cost:
+            line += f", ${self.hedge_cost:.4f} spent on losing requests"
+        return line
+
+
+def generate_icon_openrouter(food_name: str, output_dir: Path, api_key: str,
+                             client: HttpClient | None = None,
+                             cache: "RawCache | None" = None,
+                             options: ProcessOptions | None = None,
+                             base_url: str = OPENROUTER_BASE_URL,
+                             concurrency: AdaptiveConcurrency | None = None,
+                             router: ModelRouter | None = None) -> IconResult:
+    """
+    Generate a pixel art icon using OpenRouter image generation.
+    Models are tried in `router` order with hedging and circuit breaking
+    (default: ICON_MODEL alone, no hedging).
+    If `cache` holds the raw image for any of the models + prompt, no
+    request is made.
+    """
+
+    client = client or get_http_client()
+    router = router or ModelRouter(hedge=False)
+
+    output_path = output_dir / f"{safe_filename(food_name)}.png"
+
+    # Skip if already exists
+    if output_path.exists():
+        log(f"  Skipping {food_name} (already exists)")
+        return IconResult(food_name, "skipped")
+
+    start = time.monotonic()
+    prompt = icon_prompt(food_name)
+
+    def generated(note: str = "", **stats) -> IconResult:
+        log(f"  Generated: {food_name}{note}")
+        icon_bytes = output_path.read_bytes()
+        return IconResult(food_name, "generated", latency=time.monotonic() - start,
+                          sha256=hashlib.sha256(icon_bytes).hexdigest(),
+                          output_bytes=len(icon_bytes), **stats)
+
+    try:
+        cached = router.cached(cache, prompt, food_name)
+        if cached is not None:
+            process_start = time.monotonic()
+            process_icon_image(cached, output_path, options)
+            return generated(" (from cache)", process_time=time.monotonic() - process_start)
+
+        def keep_loser(loser: ImageAttempt) -> None:
+            # Already paid for; kept as a second take that reprocess can fall back on
+            cache.put(RawCache.key(loser.model + router.HEDGE_TAG, prompt, food_name), loser.img_bytes)
+
+        attempt, hedged, attempts = router.request(
+            lambda model: request_image(prompt, model, api_key, client, base_url, concurrency),
+            on_loser=keep_loser if cache else None)
+        via = f" via {attempt.model}" if len(router.models) > 1 else ""
+        if not attempt.ok:
+            log(f"  Failed: {food_name}{via} ({attempt.error}){retry_note(attempt)}")
+            result = IconResult(food_name, "failed", latency=time.monotonic() - start,
+                                error=attempt.error, model=attempt.model, hedged=hedged)
+            result.charge(attempts)
+            return result
+
+        if cache:
+            cache.put(RawCache.key(attempt.model, prompt, food_name), attempt.img_bytes)
+        process_start = time.monotonic()
+        process_icon_image(attempt.img_bytes, output_path, options)
+        result = generated(f"{via}{' (hedged)' if hedged else ''}{retry_note(attempt)}",
+                           process_time=attempt.decode_time + time.monotonic() - process_start,
+                           model=attempt.model, hedged=hedged)
+        result.charge(attempts)
+        return result
+
+    except Exception as e:
+        log(f"  Error: {food_name} - {e}")
+        return IconResult(food_name, "failed", latency=time.monotonic() - start, error=str(e))
+
+
+def generate_icon_batch(food_names: list[str], output_dir: Path, api_key: str,
+                        client: HttpClient | None = None,
+                        cache: "RawCache | None" = None,
+                        options: ProcessOptions | None = None,
+                        base_url: str = OPENROUTER_BASE_URL,
+                        concurrency: AdaptiveConcurrency | None = None,
+                        router: ModelRouter | None = None) -> tuple[list[IconResult], list[str], list[ImageAttempt]]:
+    """
+    Generate several icons with one request: ask for a grid of the foods,
+    slice it with slice_icon_grid() and save every valid cell.
+    The request follows `router`'s fallback chain and circuit breakers but
+    is never hedged (a duplicate grid is too expensive).
+    Each saved cell is also cached under its food's single-icon key, so
+    --reprocess can rebuild it. Request time, bytes, tokens and cost
+    (failed fallback attempts included) are split evenly across the cells;
+    the first saved cell also carries the retries and request count.
+    Returns results for icons that were saved (or already existed), the
+    names that still need single-item generation, and the grid attempts no
+    saved cell was charged for (the request failed or every cell was
+    rejected) so the caller can charge them to a fallback result.
+    """
+    client = client or get_http_client()
+    router = router or ModelRouter(hedge=False)
+    results = []
+    todo = []
+    for name in food_names:
+        if (output_dir / f"{safe_filename(name)}.png").exists() \
+                or router.cached(cache, icon_prompt(name), name) is not None:
+            # Nothing to batch; the single-item path skips or serves from cache
+            results.append(generate_icon_openrouter(name, output_dir, api_key, client, cache, options,
+                                                    base_url, router=router))
+        else:
+            todo.append(name)
+    if len(todo) < 2:
+        return results, todo, []
+
+    cols, rows = batch_grid_shape(len(todo))
+    label = f"batch of {len(todo)}"
+    start = time.monotonic()
+    prompt = batch_prompt(todo, cols, rows)
+    attempt, _, attempts = router.request(
+        lambda model: request_image(prompt, model, api_key, client, base_url, concurrency), hedge=False)
+    if not attempt.ok:
+        log(f"  Failed: {label} ({attempt.error}){retry_note(attempt)}")
+        return results, todo, attempts
+
+    try:
+        process_start = time.monotonic()
+        cells = slice_icon_grid(Image.open(BytesIO(attempt.img_bytes)).convert("RGBA"), cols, rows)
+        slice_time = time.monotonic() - process_start
+    except Exception as e:
+        log(f"  Error: {label} - {e}")
+        return results, todo, attempts
+
+    share = len(todo)
+    first = len(results)  # Index of the first cell's result, which carries the requests
+    leftovers = []
+    for name, cell in zip(todo, cells):
+        if cell is None:
+            leftovers.append(name)
+            continue
+
+        output_path = output_dir / f"{safe_filename(name)}.png"
+        process_start = time.monotonic()
+        if cache:
+            buf = BytesIO()
+            cell.save(buf, "PNG")
+            cache.put(RawCache.key(attempt.model, icon_prompt(name), name), buf.getvalue())
+        save_icon(cell, output_path, options)
+        icon_bytes = output_path.read_bytes()
+        log(f"  Generated: {name} ({label}){retry_note(attempt)}")
+        result = IconResult(
+            name, "generated", latency=time.monotonic() - start,
+            sha256=hashlib.sha256(icon_bytes).hexdigest(), output_bytes=len(icon_bytes),
+            process_time=(attempt.decode_time + slice_time) / share + time.monotonic() - process_start,
+            model=attempt.model,
+        )
+        result.charge(attempts, share, requests=len(results) == first)
+        results.append(result)
+
+    if leftovers:
+        log(f"  {len(leftovers)} of {len(todo)} cells rejected: {', '.join(leftovers)}")
+    return results, leftovers, attempts if len(results) == first else []
+
+
+def reprocess_from_cache(foods: list, output_dir: Path, cache: RawCache,
+                         options: ProcessOptions | None = None,
+                         models: list[str] | tuple[str, ...] = (ICON_MODEL,)) -> tuple[int, int]:
+    """
+    Rebuild icons from cached raw images without any network access.
+    For each food the first of `models` with a cached image is used.
+    Returns (rebuilt, missing) counts.
+    """
+    router = ModelRouter(models, hedge=False)
+    rebuilt = 0
+    missing = 0
+    for food in foods:
+        name = food["name"] if isinstance(food, dict) else food
+        data = router.cached(cache, icon_prompt(name), name)
+        if data is None:
+            print(f"  Not cached: {name}")
+            missing += 1
+            continue
+        process_icon_image(data, output_dir / f"{safe_filename(name)}.png", options)
+        rebuilt += 1
+    return rebuilt, missing
@@ -0,0 +1,257 @@
+"""Icon post-processing - downsampling, web formats and batch grid slicing."""
+
+import json
+import math
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Please install pillow: pip install pillow")
+    exit(1)
+
+from .config import ICON_SIZE, NATIVE_SIZE
+
+np = None  # numpy is imported on first use; only grid downsampling and batch slicing need it
+
+
+def _require_numpy(feature: str) -> None:
+    """Import numpy into this module, or exit with an install hint for `feature`."""
+    global np
+    if np is not None:
+        return
+    try:
+        import numpy
+    except ImportError:
+        print(f"Please install numpy for {feature}: pip install numpy")
+        exit(1)
+    np = numpy
+
+
+WEB_DIR = "web"
+FORMAT_REPORT = "format_report.json"
+WEB_FORMATS = {
+    "png": ("PNG", {"optimize": True}),
+    "webp": ("WEBP", {"lossless": True, "quality": 100, "method": 6, "exact": True}),
+    # Pillow's AVIF encoder has no true lossless mode; 4:4:4 at q100 is within 1 level per channel
+    "avif": ("AVIF", {"quality": 100, "subsampling": "4:4:4", "speed": 0}),
+}
+
+
+@dataclass
+class ProcessOptions:
+    """How raw model images are turned into icon files."""
+    downsample: str = "nearest"  # "nearest" or "grid" (see recover_pixel_grid)
+    formats: tuple[str, ...] = ()  # Extra web variants to write, keys of WEB_FORMATS
+
+
+def process_icon_image(img_bytes: bytes, output_path: Path, options: ProcessOptions | None = None) -> None:
+    """
+    Turn raw model image bytes into the final icon file.
+    If options.formats is set, native-resolution (@1x) and 2x variants in
+    each format are written to <output_dir>/web from the same decoded image.
+    """
+    save_icon(Image.open(BytesIO(img_bytes)).convert("RGBA"), output_path, options)
+
+
+def save_icon(img: Image.Image, output_path: Path, options: ProcessOptions | None = None) -> None:
+    """Downsample a decoded RGBA model image and write the icon (and any web variants)."""
+    options = options or ProcessOptions()
+    if options.downsample == "grid":
+        img = recover_pixel_grid(img)
+
+    icon = img.resize((ICON_SIZE, ICON_SIZE), Image.Resampling.NEAREST)
+    icon.save(output_path, "PNG")
+
+    if options.formats:
+        web_dir = output_path.parent / WEB_DIR
+        web_dir.mkdir(exist_ok=True)
+        native = img.resize((NATIVE_SIZE, NATIVE_SIZE), Image.Resampling.NEAREST)
+        variants = {1: native, 2: native.resize((NATIVE_SIZE * 2, NATIVE_SIZE * 2), Image.Resampling.NEAREST)}
+        for fmt in options.formats:
+            pil_format, params = WEB_FORMATS[fmt]
+            for scale, variant in variants.items():
+                variant.save(web_dir / f"{output_path.stem}@{scale}x.{fmt}", pil_format, **params)
+
+
+def available_web_formats() -> list[str]:
+    """Formats from WEB_FORMATS that this Pillow build can encode."""
+    from PIL import features
+    return [fmt for fmt in WEB_FORMATS if fmt == "png" or features.check(fmt)]
+
+
+def format_report(output_dir: Path) -> dict:
+    """Total bytes per format and scale for the icons in output_dir."""
+    report = {"icons": len(list(output_dir.glob("*.png"))),
+              f"png@{ICON_SIZE}": sum(p.stat().st_size for p in output_dir.glob("*.png"))}
+    web_dir = output_dir / WEB_DIR
+    for fmt in WEB_FORMATS:
+        for scale in (1, 2):
+            files = list(web_dir.glob(f"*@{scale}x.{fmt}"))
+            if files:
+                report[f"{fmt}@{scale}x"] = sum(p.stat().st_size for p in files)
+    return report
+
+
+def write_format_report(output_dir: Path) -> None:
+    """Write and print the bytes-per-format report."""
+    report = format_report(output_dir)
+    (output_dir / WEB_DIR).mkdir(exist_ok=True)
+    with open(output_dir / WEB_DIR / FORMAT_REPORT, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nBytes per format ({report['icons']} icons):")
+    sizes = {key: value for key, value in report.items() if key != "icons"}
+    for key, size in sorted(sizes.items(), key=lambda item: item[1]):
+        print(f"  {key:10} {size / 1024:8.1f} KB")
+
+
+# =============================================================================
+# Pixel Grid Recovery - snap model "pixel art" back onto its logical grid
+# =============================================================================
+def _detect_cells(profile: "np.ndarray", length: int, min_cells: int, max_cells: int) -> int:
+    """
+    Find how many logical pixels span an axis from its edge-strength profile.
+    Scores each candidate count by how strong the edges are where its cell
+    boundaries would fall (with one pixel of slack for uneven blocks), then
+    picks the finest grid that scores close to the best one, since coarser
+    grids that are divisors of the true grid score just as well.
+    """
+    # Allow boundaries to be off by one pixel
+    slack = profile.copy()
+    slack[1:] = np.maximum(slack[1:], profile[:-1])
+    slack[:-1] = np.maximum(slack[:-1], profile[1:])
+    baseline = profile.mean() or 1.0
+
+    counts = np.arange(min_cells, max_cells + 1)
+    scores = np.empty(len(counts))
+    for i, n in enumerate(counts):
+        boundaries = np.rint(np.arange(1, n) * (length / n)).astype(int) - 1
+        scores[i] = slack[boundaries].mean() / baseline
+
+    good = counts[scores >= scores.max() * 0.85]
+    return int(good.max())
+
+
+def _block_mode(samples: "np.ndarray") -> "np.ndarray":
+    """Most common value along the last axis, computed for every row at once."""
+    values = np.sort(samples, axis=-1)
+    positions = np.arange(values.shape[-1])
+    starts = np.where(np.diff(values, axis=-1, prepend=values[..., :1] - 1) != 0, positions, 0)
+    run_lengths = positions - np.maximum.accumulate(starts, axis=-1) + 1
+    best = run_lengths.argmax(axis=-1)
+    return np.take_along_axis(values, best[..., None], axis=-1)[..., 0]
+
+
+def recover_pixel_grid(img: Image.Image, min_cells: int = 16, max_cells: int = 128,
+                       samples: int = 5) -> Image.Image:
+    """
+    Reduce a model-generated "pixel art" image to its logical pixels.
+    Detects the grid along each axis, then replaces every block with its
+    dominant color, sampled from the block's interior so edges never bleed in.
+    Returns an image with one pixel per logical pixel.
+    """
+    _require_numpy("grid downsampling")
+
+    rgba = np.asarray(img.convert("RGBA"))
+    height, width = rgba.shape[:2]
+    signed = rgba.astype(np.int16)
+    col_profile = np.abs(np.diff(signed, axis=1)).sum(axis=(0, 2)).astype(float)
+    row_profile = np.abs(np.diff(signed, axis=0)).sum(axis=(1, 2)).astype(float)
+
+    cols = _detect_cells(col_profile, width, min_cells, min(max_cells, width // 2))
+    rows = _detect_cells(row_profile, height, min_cells, min(max_cells, height // 2))
+
+    # Sample points spread over the middle 60% of each block
+    offsets = np.linspace(0.2, 0.8, samples)
+    xs = np.floor((np.arange(cols)[:, None] + offsets) * (width / cols)).astype(int)
+    ys = np.floor((np.arange(rows)[:, None] + offsets) * (height / rows)).astype(int)
+
+    packed = rgba.view(np.uint32)[..., 0]  # One uint32 per RGBA pixel
+    blocks = packed[ys[:, None, :, None], xs[None, :, None, :]]  # (rows, cols, samples, samples)
+    modes = _block_mode(blocks.reshape(rows, cols, samples * samples))
+
+    return Image.fromarray(np.ascontiguousarray(modes).view(np.uint8).reshape(rows, cols, 4), "RGBA")
+
+
+# =============================================================================
+# Grid Slicing - split batch responses into one icon per food
+# =============================================================================
+def batch_grid_shape(count: int) -> tuple[int, int]:
+    """Columns and rows of the most square grid holding `count` icons."""
+    cols = math.ceil(math.sqrt(count))
+    return cols, math.ceil(count / cols)
+
+
+def _find_cuts(occupancy: "np.ndarray", cells: int, search: float = 0.25,
+               max_occupancy: float = 0.01) -> tuple[list[int], list[bool]]:
+    """
+    Place the boundaries between `cells` cells along one axis.
+    Each boundary goes in the emptiest gutter within `search` of a cell
+    width around its expected position (the middle of the gutter if it is
+    wide). Returns the cut positions including both ends, and whether each
+    inner cut crosses no more than `max_occupancy` of foreground.
+    """
+    length = len(occupancy)
+    cell = length / cells
+    cuts, clean = [0], []
+    for i in range(1, cells):
+        lo = max(1, int(i * cell - cell * search))
+        hi = min(length - 1, int(i * cell + cell * search))
+        window = occupancy[lo:hi]
+        emptiest = np.flatnonzero(window <= window.min() + 1e-9)
+        cuts.append(lo + int(np.median(emptiest)))
+        clean.append(bool(window.min() <= max_occupancy))
+    cuts.append(length)
+    return cuts, clean
+
+
+def slice_icon_grid(img: Image.Image, cols: int, rows: int, tolerance: int = 48,
+                    min_coverage: float = 0.02, max_coverage: float = 0.8) -> list[Image.Image | None]:
+    """
+    Cut a generated grid image into its cells, in reading order.
+    The background is the most common border color; gutters are found from
+    foreground occupancy per column and row. A cell is rejected (None) if a
+    boundary next to it cuts through foreground, its foreground coverage is
+    implausible (empty or a solid fill), its icon touches the cell edge, or
+    the cell is far from square. Valid cells are cropped to a square around
+    their center so framing matches single-icon output.
+    """
+    _require_numpy("batch generation")
+
+    rgba = np.asarray(img.convert("RGBA"))
+    height, width = rgba.shape[:2]
+    packed = rgba.view(np.uint32)[..., 0]
+    border = np.concatenate([packed[0], packed[-1], packed[:, 0], packed[:, -1]])
+    values, counts = np.unique(border, return_counts=True)
+    background = np.array([values[counts.argmax()]], dtype=np.uint32).view(np.uint8).astype(np.int16)
+    foreground = np.abs(rgba.astype(np.int16) - background).sum(axis=-1) > tolerance
+
+    xcuts, xclean = _find_cuts(foreground.mean(axis=0), cols)
+    ycuts, yclean = _find_cuts(foreground.mean(axis=1), rows)
+
+    cells = []
+    for r in range(rows):
+        for c in range(cols):
+            x0, x1, y0, y1 = xcuts[c], xcuts[c + 1], ycuts[r], ycuts[r + 1]
+            cuts_ok = (c == 0 or xclean[c - 1]) and (c == cols - 1 or xclean[c]) \
+                and (r == 0 or yclean[r - 1]) and (r == rows - 1 or yclean[r])
+            mask = foreground[y0:y1, x0:x1]
+            coverage = mask.mean() if mask.size else 0.0
+            if not cuts_ok or not min_coverage <= coverage <= max_coverage \
+                    or not 0.75 <= (x1 - x0) / max(1, y1 - y0) <= 1.33:
+                cells.append(None)
+                continue
+
+            ys, xs = np.nonzero(mask)
+            if ys.min() == 0 or xs.min() == 0 or ys.max() == mask.shape[0] - 1 or xs.max() == mask.shape[1] - 1:
+                cells.append(None)  # Icon runs off the cell
+                continue
+
+            side = min(x1 - x0, y1 - y0)
+            cx = min(max(x0 + (xs.min() + xs.max()) // 2, x0 + side // 2), x1 - (side - side // 2))
+            cy = min(max(y0 + (ys.min() + ys.max()) // 2, y0 + side // 2), y1 - (side - side // 2))
+            cells.append(img.crop((cx - side // 2, cy - side // 2, cx - side // 2 + side, cy - side // 2 + side)))
+    return cells
@@ -0,0 +1,115 @@
+"""Resolution manifest - precomputed name -> icon lookups for the app."""
+
+import re
+from pathlib import Path
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a food name the same way as normalizeName() in src/lib/food-icons.ts."""
+    name = name.lower()
+    name = re.sub(r"\s*\([^)]*\)\s*", "", name)  # Remove brand names in parentheses
+    name = re.sub(r"\s+", "_", name)  # Replace spaces with underscores
+    name = re.sub(r"[^a-z0-9_]", "", name)  # Remove special characters
+    return name.strip()
+
+
+# Container and portion words never count as the head noun ("yogurt cup" is a yogurt)
+PACKAGING_WORDS = {"bag", "bar", "bottle", "box", "can", "carton", "chunk", "container", "cup", "fillet", "jar",
+                   "pack", "packet", "piece", "pouch", "slice", "strip", "tray", "tub"}
+STOPWORDS = {"a", "an", "and", "the", "of"}
+# Everything after one of these describes the item ("tuna in water")
+PREPOSITIONS = {"in", "with", "for", "from"}
+# Plurals of "-ie" nouns; every other "-ies" becomes "-y" (cherries -> cherry)
+IE_PLURALS = {"brownies", "cookies", "hoagies", "smoothies", "veggies"}
+
+
+def singular(token: str) -> str:
+    """English plural -> singular for one token (cherries, tomatoes, peaches, apples)."""
+    if token in IE_PLURALS:
+        return token[:-1]
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("es") and token[:-2].endswith(("ss", "x", "z", "ch", "sh", "o")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def name_tokens(name: str, qualifiers: bool = False) -> list[str]:
+    """
+    Ordered, singularized, de-duplicated tokens of a raw or normalized name.
+    Words after a preposition describe the item and are dropped, unless
+    `qualifiers` is set ("tuna in water" -> tuna, or tuna + water).
+    """
+    tokens = []
+    for token in normalize_name(name).split("_"):
+        if token in PREPOSITIONS and tokens:
+            if not qualifiers:
+                break
+            continue
+        if token and token not in STOPWORDS and not token.isdigit():
+            token = singular(token)
+            if token not in tokens:
+                tokens.append(token)
+    return tokens
+
+
+def head_token(tokens: list[str]) -> str | None:
+    """Last token that isn't a container word; English compounds put the head noun last."""
+    for token in reversed(tokens):
+        if token not in PACKAGING_WORDS:
+            return token
+    return tokens[-1] if tokens else None
+
+
+def lookup_variations(normalized: str) -> list[str]:
+    """Icon names getFoodIconPath() tries, in order: exact, minus "s", minus "es"."""
+    variations = [normalized]
+    if normalized.endswith("s") and len(normalized) > 2:
+        variations.append(normalized[:-1])
+    if normalized.endswith("es") and len(normalized) > 3:
+        variations.append(normalized[:-2])
+    return variations
+
+
+def resolve_icon(normalized: str, icons: set[str]) -> str | None:
+    """Resolve a normalized name to an icon the way the client's fallback chain does."""
+    for variation in lookup_variations(normalized):
+        if variation in icons:
+            return variation
+    return None
+
+
+def build_manifest(icons_dir: Path, aliases: dict[str, str] | None = None) -> dict:
+    """
+    Map every key the client can resolve to the icon file it would end up on.
+    `aliases` (normalized name -> icon name) add keys for names whose icon
+    was collapsed into another one; real icons always win over aliases.
+    Keys are sorted and stored parallel to their files, so the client can
+    binary-search `keys` or build a Map in one pass without probing URLs.
+    """
+    icons = {path.stem for path in icons_dir.glob("*.png")}
+
+    resolved = {}
+    for icon in icons:
+        # Only icon, icon+"s" and icon+"es" can reach an icon through the plural rules
+        for key in (icon, icon + "s", icon + "es"):
+            target = resolve_icon(key, icons)
+            if target is not None:
+                resolved[key] = target
+
+    for alias, icon in (aliases or {}).items():
+        target = resolve_icon(icon, icons)
+        if target is None:
+            continue
+        for key in (alias, alias + "s", alias + "es"):
+            if key not in resolved and alias in lookup_variations(key):
+                resolved[key] = target
+
+    keys = sorted(resolved)
+    return {
+        "version": 1,
+        "keys": keys,
+        "files": [f"{resolved[key]}.png" for key in keys],
+    }
@@ -0,0 +1,120 @@
+"""Miss log - rank the names the app fell back to a category icon for."""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+from .manifest import build_manifest, lookup_variations, normalize_name
+
+
+class MissCounter:
+    """
+    Streaming counts of missed names from JSONL miss logs.
+    Each line is {"name": ..., "iconHint": ..., "category": ...} with an
+    optional "count"; the looked-up name is iconHint or name, the same value
+    FoodIcon receives. Lines are read one at a time, so only the per-name
+    counts are kept in memory.
+    """
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self.categories: dict[str, Counter[str]] = {}
+        self.lines = 0
+        self.skipped = 0  # Unparseable lines or lines without a name
+
+    def add(self, name: str, category: str | None = None, count: int = 1) -> None:
+        key = normalize_name(name)
+        if not key:
+            self.skipped += 1
+            return
+        self.counts[key] += count
+        if category:
+            self.categories.setdefault(key, Counter())[category] += count
+
+    def read(self, path: Path) -> None:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                self.lines += 1
+                try:
+                    record = json.loads(line)
+                    name = record.get("iconHint") or record.get("name")
+                    count = int(record.get("count", 1))
+                except (ValueError, TypeError, AttributeError):
+                    self.skipped += 1
+                    continue
+                if not isinstance(name, str):
+                    self.skipped += 1
+                    continue
+                self.add(name, record.get("category"), count)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def merged(self) -> Counter[str]:
+        """
+        Counts with plural keys folded onto a singular key that was also
+        missed ("apples" onto "apple"), since one icon answers both.
+        """
+        def target(key: str) -> str:
+            seen = {key}
+            while True:
+                singular = next((v for v in lookup_variations(key)[1:] if v in self.counts), None)
+                if singular is None or singular in seen:
+                    return key
+                seen.add(singular)
+                key = singular
+
+        merged: Counter[str] = Counter()
+        for key, count in self.counts.items():
+            merged[target(key)] += count
+        return merged
+
+    def category(self, key: str) -> str | None:
+        """Most reported category for a key and the plurals folded onto it."""
+        counts = Counter()
+        for variant in (key, key + "s", key + "es"):
+            counts.update(self.categories.get(variant, {}))
+        return counts.most_common(1)[0][0] if counts else None
+
+    def top_missing(self, n: int, icons_dir: Path,
+                    aliases: dict[str, str] | None = None) -> tuple[list[dict], int]:
+        """
+        The n most missed names that still don't resolve through the manifest
+        built from `icons_dir` (icons generated since the log was taken are
+        skipped). Returns foods ({"name", "category", "misses"}) and how many
+        misses the current icons already cover.
+        """
+        resolvable = set(build_manifest(icons_dir, aliases)["keys"]) if icons_dir.exists() else set()
+        covered = 0
+        missing: Counter[str] = Counter()
+        for key, count in self.merged().items():
+            if key in resolvable:
+                covered += count
+            else:
+                missing[key] = count
+
+        foods = []
+        for key, count in missing.most_common(n):
+            food = {"name": key.replace("_", " "), "misses": count}
+            category = self.category(key)
+            if category:
+                food["category"] = category
+            foods.append(food)
+        return foods, covered
+
+
+def print_miss_summary(misses: MissCounter, top: list[dict], covered: int) -> None:
+    """Print what the miss log contained and how much of it the selection covers."""
+    total = misses.total
+    remaining = total - covered
+    selected = sum(food["misses"] for food in top)
+    print(f"Miss log: {misses.lines} lines, {total} misses of {len(misses.counts)} names"
+          + (f", {misses.skipped} unusable lines" if misses.skipped else ""))
+    print(f"Already resolvable: {covered} misses ({covered / total * 100 if total else 0:.1f}%)")
+    print(f"Selected top {len(top)} names: {selected} of {remaining} remaining misses "
+          f"({selected / remaining * 100 if remaining else 0:.1f}%)")
+    for food in top[:20]:
+        print(f"  {food['misses']:6}  {food['name']}" + (f" ({food['category']})" if "category" in food else ""))
@@ -0,0 +1,105 @@
+"""Native export - Android density buckets and an iOS asset catalog."""
+
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from .config import ANDROID_RES_DIR, IOS_ASSETS_DIR, IOS_ICON_FOLDER, NATIVE_EXPORT_STATE, NATIVE_SIZE
+
+
+# Icons are NATIVE_SIZE dp/pt; pixel sizes per Android density and iOS scale
+ANDROID_DENSITIES = {"mdpi": 1.0, "hdpi": 1.5, "xhdpi": 2.0, "xxhdpi": 3.0, "xxxhdpi": 4.0}
+IOS_SCALES = (1, 2, 3)
+
+XCASSETS_INFO = {"author": "xcode", "version": 1}
+
+
+def _native_outputs(stem: str, android_res: Path, ios_assets: Path) -> list[Path]:
+    """Every file _export_native_icon() writes for one icon."""
+    imageset = ios_assets / IOS_ICON_FOLDER / f"{stem}.imageset"
+    return ([android_res / f"drawable-{density}" / f"food_{stem}.png" for density in ANDROID_DENSITIES]
+            + [imageset / (f"{stem}.png" if scale == 1 else f"{stem}@{scale}x.png") for scale in IOS_SCALES]
+            + [imageset / "Contents.json"])
+
+
+def _export_native_icon(source: Path, android_res: Path, ios_assets: Path) -> None:
+    """Render one icon into every Android density bucket and an iOS imageset."""
+    img = Image.open(source).convert("RGBA")
+    # Icons are drawn at NATIVE_SIZE; go back to it before scaling up so every
+    # bucket is scaled from the logical pixels
+    native = img.resize((NATIVE_SIZE, NATIVE_SIZE), Image.Resampling.NEAREST)
+
+    for density, scale in ANDROID_DENSITIES.items():
+        size = round(NATIVE_SIZE * scale)
+        out_dir = android_res / f"drawable-{density}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        native.resize((size, size), Image.Resampling.NEAREST).save(
+            out_dir / f"food_{source.stem}.png", "PNG", optimize=True)
+
+    imageset = ios_assets / IOS_ICON_FOLDER / f"{source.stem}.imageset"
+    imageset.mkdir(parents=True, exist_ok=True)
+    images = []
+    for scale in IOS_SCALES:
+        filename = f"{source.stem}.png" if scale == 1 else f"{source.stem}@{scale}x.png"
+        size = NATIVE_SIZE * scale
+        native.resize((size, size), Image.Resampling.NEAREST).save(imageset / filename, "PNG", optimize=True)
+        images.append({"filename": filename, "idiom": "universal", "scale": f"{scale}x"})
+    with open(imageset / "Contents.json", "w") as f:
+        json.dump({"images": images, "info": XCASSETS_INFO}, f, indent=2)
+
+
+def _remove_native_icon(stem: str, android_res: Path, ios_assets: Path) -> None:
+    for density in ANDROID_DENSITIES:
+        (android_res / f"drawable-{density}" / f"food_{stem}.png").unlink(missing_ok=True)
+    imageset = ios_assets / IOS_ICON_FOLDER / f"{stem}.imageset"
+    if imageset.exists():
+        shutil.rmtree(imageset)
+
+
+def export_native_icons(icons_dir: Path, android_res: Path = ANDROID_RES_DIR,
+                        ios_assets: Path = IOS_ASSETS_DIR, state_path: Path = NATIVE_EXPORT_STATE,
+                        workers: int | None = None) -> dict:
+    """
+    Export icons as Android drawables (drawable-<density>/food_<name>.png) and
+    an iOS asset catalog folder (FoodIcons/<name>.imageset).
+    Source hashes from the last export to each pair of output directories
+    are kept in `state_path`, so only new or changed icons (or icons with a
+    missing output file) are rendered and icons that disappeared are removed.
+    """
+    target = f"{android_res.resolve()}|{ios_assets.resolve()}"
+    state = {}
+    if state_path.exists():
+        with open(state_path) as f:
+            state = json.load(f)
+    targets = state.get("targets", {})  # Older flat {name: hash} files start over
+    previous = targets.get(target, {})
+
+    hashes = {path.stem: hashlib.sha256(path.read_bytes()).hexdigest()
+              for path in sorted(icons_dir.glob("*.png"))}
+    folder = ios_assets / IOS_ICON_FOLDER
+    changed = [stem for stem, digest in hashes.items()
+               if previous.get(stem) != digest
+               or not all(path.exists() for path in _native_outputs(stem, android_res, ios_assets))]
+    removed = [stem for stem in previous if stem not in hashes]
+
+    folder.mkdir(parents=True, exist_ok=True)
+    with open(folder / "Contents.json", "w") as f:
+        json.dump({"info": XCASSETS_INFO, "properties": {"provides-namespace": True}}, f, indent=2)
+
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sources = [icons_dir / f"{stem}.png" for stem in changed]
+            list(executor.map(_export_native_icon, sources,
+                              [android_res] * len(sources), [ios_assets] * len(sources), chunksize=8))
+    for stem in removed:
+        _remove_native_icon(stem, android_res, ios_assets)
+
+    targets[target] = hashes
+    with open(state_path, "w") as f:
+        json.dump({"targets": targets}, f, indent=2, sort_keys=True)
+
+    return {"icons": len(hashes), "rendered": len(changed), "removed": len(removed)}
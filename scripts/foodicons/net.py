@@ -0,0 +1,341 @@
+"""HTTP client - pooled keep-alive connections, timeouts and retries."""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on in-flight requests, fed back from each HTTP attempt.
+    Healthy responses add 1/limit (about +1 per window of requests). A 429,
+    5xx or connection error halves the limit, at most once per round trip so
+    one burst of rejections counts once. Retry-After also pauses every
+    worker until it expires. Latency drifting well above its baseline is
+    treated as queueing upstream and trims the limit gently.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(max(minimum, min(maximum, initial)))
+        self.in_flight = 0
+        self.lowest = self.peak = self.limit
+        self.decreases = 0
+        self.latency = None  # Smoothed latency of successful attempts
+        self.baseline = None  # Slow-moving floor of self.latency
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def current(self) -> int:
+        return int(self.limit)
+
+    def acquire(self) -> None:
+        """Block until a request slot is free and no Retry-After pause is active."""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight < int(self.limit):
+                    break
+                else:
+                    self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, status: int | None, latency: float, retry_after: float | None = None) -> None:
+        """Return a slot, adjusting the limit from the attempt's outcome (status None = no response)."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            window = self.latency or latency
+
+            if status is None or status in RETRY_STATUSES:
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                self._decrease(self.backoff, now, window)
+            elif status < 400:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                if self.baseline is None or self.latency < self.baseline:
+                    self.baseline = self.latency
+                else:
+                    self.baseline += (self.latency - self.baseline) * 0.01
+
+                if self.latency > self.baseline * self.latency_tolerance:
+                    self._decrease(0.9, now, window)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.peak = max(self.peak, self.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, factor: float, now: float, window: float) -> None:
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+        self.lowest = min(self.lowest, self.limit)
+        self.decreases += 1
+
+
+class CachedResponse:
+    """Response served from the on-disk HTTP cache (the parts of requests.Response we use)."""
+
+    def __init__(self, status_code: int, content: bytes, headers: dict | None = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.retries = 0
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    """
+    On-disk cache for GET responses, revalidated with ETag/Last-Modified.
+    Entries younger than `ttl` seconds are served without touching the
+    network; older ones are revalidated with a conditional request, and a
+    304 refreshes the entry without re-downloading it. With `offline`, only
+    the cache is consulted. Query params listed in `secret_params` are left
+    out of the cache key so API keys never end up on disk.
+    """
+
+    def __init__(self, path: Path, ttl: float = 24 * 3600, offline: bool = False,
+                 secret_params: tuple[str, ...] = ("apiKey",)):
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+        self.secret_params = secret_params
+
+    def key(self, url: str, params: dict | None = None) -> str:
+        public = sorted((k, str(v)) for k, v in (params or {}).items() if k not in self.secret_params)
+        return hashlib.sha256(json.dumps([url, public]).encode()).hexdigest()
+
+    def load(self, key: str) -> tuple[dict, bytes] | None:
+        try:
+            with open(self.path / f"{key}.json") as f:
+                meta = json.load(f)
+            return meta, (self.path / f"{key}.body").read_bytes()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def store(self, key: str, url: str, meta: dict, body: bytes | None = None) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        if body is not None:
+            tmp = self.path / f"{key}.body.{threading.get_ident()}.tmp"
+            tmp.write_bytes(body)
+            os.replace(tmp, self.path / f"{key}.body")
+        tmp = self.path / f"{key}.json.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({**meta, "url": url, "fetched_at": time.time()}, f)
+        os.replace(tmp, self.path / f"{key}.json")
+
+
+class HttpClient:
+    """
+    Shared requests.Session used by every network call.
+    Reuses keep-alive connections, applies connect/read timeouts and retries
+    429/5xx responses and connection errors with jittered exponential backoff,
+    honoring Retry-After when the server sends it.
+    The number of retries a request needed is stored on `response.retries`.
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 10.0,
+                 read_timeout: float = 120.0, max_retries: int = 4,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 http_cache: HttpCache | None = None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.http_cache = http_cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, retries: int) -> float:
+        """Full-jitter exponential backoff for the given retry number."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retries))
+
+    def _retry_after(self, response: requests.Response) -> float | None:
+        """Parse a Retry-After header (seconds or HTTP date), if present."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        # Small jitter so parallel workers don't all wake at once
+        return min(self.backoff_max, max(0.0, seconds)) + random.uniform(0, self.backoff_base)
+
+    def request(self, method: str, url: str, concurrency: AdaptiveConcurrency | None = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request with retries. If `concurrency` is given, each attempt
+        holds one of its slots and reports its outcome back to it; backoff
+        sleeps happen outside the slot.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        retries = 0
+        while True:
+            if concurrency:
+                concurrency.acquire()
+            attempt_start = time.monotonic()
+            response = None
+            retry_after = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code in RETRY_STATUSES:
+                    retry_after = self._retry_after(response)
+            except (requests.ConnectionError, requests.Timeout):
+                if retries >= self.max_retries:
+                    raise
+            finally:
+                if concurrency:
+                    concurrency.release(response.status_code if response is not None else None,
+                                        time.monotonic() - attempt_start, retry_after)
+
+            if response is None:
+                delay = self._backoff(retries)
+            else:
+                if response.status_code not in RETRY_STATUSES or retries >= self.max_retries:
+                    response.retries = retries
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff(retries)
+                response.close()
+
+            retries += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def cached_get(self, url: str, params: dict | None = None,
+                   limiter: TokenBucket | None = None, **kwargs):
+        """
+        GET through the HTTP cache, if one is configured.
+        Serves fresh entries directly, revalidates stale ones and falls back
+        to a stale copy if the server errors. Offline misses get a 504.
+        `limiter` is only charged when a request actually goes out.
+        """
+        cache = self.http_cache
+        if cache is None:
+            if limiter:
+                limiter.acquire()
+            return self.get(url, params=params, **kwargs)
+
+        key = cache.key(url, params)
+        cached = cache.load(key)
+        if cached is not None:
+            meta, body = cached
+            if cache.offline or time.time() - meta["fetched_at"] < cache.ttl:
+                return CachedResponse(200, body, meta.get("headers"))
+        elif cache.offline:
+            return CachedResponse(504, b"Not in HTTP cache (offline)")
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached is not None:
+            if cached[0].get("etag"):
+                headers["If-None-Match"] = cached[0]["etag"]
+            if cached[0].get("last_modified"):
+                headers["If-Modified-Since"] = cached[0]["last_modified"]
+
+        if limiter:
+            limiter.acquire()
+        try:
+            response = self.get(url, params=params, headers=headers, **kwargs)
+        except requests.RequestException:
+            if cached is None:
+                raise
+            return CachedResponse(200, cached[1], cached[0].get("headers"))
+
+        if response.status_code == 304 and cached is not None:
+            cache.store(key, url, cached[0])
+            revalidated = CachedResponse(200, cached[1], cached[0].get("headers"))
+            revalidated.retries = response.retries
+            return revalidated
+
+        if response.status_code == 200:
+            cache.store(key, url, {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            }, response.content)
+        elif cached is not None:
+            # Serve stale rather than fail the whole fetch
+            return CachedResponse(200, cached[1], cached[0].get("headers"))
+
+        return response
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the process-wide default HttpClient."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def retry_note(response: requests.Response) -> str:
+    """Suffix describing how many retries a response needed."""
+    retries = getattr(response, "retries", 0)
+    if not retries:
+        return ""
+    return f" ({retries} {'retry' if retries == 1 else 'retries'})"
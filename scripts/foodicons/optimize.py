@@ -0,0 +1,74 @@
+"""PNG optimization - indexed palettes, no metadata, best compression."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+
+def _index_exact(img: Image.Image, colors: list) -> Image.Image:
+    """Convert an RGBA image with <= 256 colors to a lossless palette image."""
+    palette = [color for _, color in colors]
+    lookup = {bytes(color): i for i, color in enumerate(palette)}
+    rgba = img.tobytes()
+    indexed = Image.frombytes("P", img.size, bytes(lookup[rgba[i:i + 4]] for i in range(0, len(rgba), 4)))
+    if all(color[3] == 255 for color in palette):
+        indexed.putpalette(b"".join(bytes(color[:3]) for color in palette), rawmode="RGB")
+    else:
+        indexed.putpalette(b"".join(bytes(color) for color in palette), rawmode="RGBA")
+    return indexed
+
+
+def optimize_png(path: Path, max_colors: int = 256) -> tuple[int, int]:
+    """
+    Rewrite a PNG as an indexed-palette image with metadata stripped, keeping
+    whichever encoding is smallest. Images with more than `max_colors` colors
+    are quantized. The file is only replaced if the result is smaller.
+    Returns (bytes_before, bytes_after).
+    """
+    original = path.read_bytes()
+    img = Image.open(BytesIO(original)).convert("RGBA")
+    max_colors = min(max_colors, 256)  # PNG palette limit
+
+    colors = img.getcolors(max_colors)
+    if colors is None:
+        # Too many colors: quantize, then rebuild a tight palette of only the used entries
+        img = img.quantize(max_colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE).convert("RGBA")
+        colors = img.getcolors(max_colors)
+    indexed = _index_exact(img, colors)
+    palette_size = len(colors)
+
+    candidates = [{"optimize": True}]
+    for bits in (4, 2, 1):
+        if palette_size <= 2 ** bits:
+            candidates.append({"optimize": True, "bits": bits})
+
+    best = original
+    for params in candidates:
+        buf = BytesIO()
+        indexed.save(buf, "PNG", **params)
+        if len(buf.getvalue()) < len(best):
+            best = buf.getvalue()
+
+    if best is not original:
+        tmp = path.with_suffix(".png.tmp")
+        tmp.write_bytes(best)
+        os.replace(tmp, path)
+    return len(original), len(best)
+
+
+def optimize_icons(paths: list[Path], max_colors: int = 256, workers: int | None = None) -> tuple[int, int]:
+    """Optimize PNGs across a process pool. Returns total (bytes_before, bytes_after)."""
+    before = after = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for size_before, size_after in executor.map(optimize_png, paths, [max_colors] * len(paths), chunksize=16):
+            before += size_before
+            after += size_after
+    return before, after
+
+
+def print_optimize_summary(count: int, before: int, after: int) -> None:
+    saved = (1 - after / before) * 100 if before else 0
+    print(f"Optimized {count} PNGs: {before / 1024:.1f} KB -> {after / 1024:.1f} KB (-{saved:.1f}%)")
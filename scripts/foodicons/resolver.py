@@ -0,0 +1,176 @@
+"""
+Fuzzy resolver - map arbitrary item names ("organic baby spinach (Brand)",
+"greek yogurt cup") to an icon through a compact token index.
+"""
+
+import json
+import math
+import time
+from pathlib import Path
+
+from .manifest import head_token, lookup_variations, name_tokens, normalize_name
+
+
+RESOLVER_FILE = "resolver.json"
+HEAD_BONUS = 0.5  # Added when the icon's head noun is the query's head noun
+HEAD_MISSING = 0.5  # Score multiplier when the icon's head noun isn't in the query at all
+MIN_SCORE = 0.5
+
+
+def build_resolver(icons_dir: Path, aliases: dict[str, str] | None = None) -> dict:
+    """
+    Compile icons (and aliases pointing at them) into a token index:
+    files, entries of [file index, total token weight, head token], and
+    token -> [idf weight, entry indices]. Names with the same token set keep
+    only their shortest spelling, so "almond"/"almonds" share one entry.
+    """
+    icons = sorted(path.stem for path in icons_dir.glob("*.png"))
+    files = [f"{icon}.png" for icon in icons]
+    file_index = {icon: i for i, icon in enumerate(icons)}
+
+    names = [(icon, file_index[icon]) for icon in icons]
+    exact_aliases = {}
+    for alias, icon in sorted((aliases or {}).items()):
+        target = next((v for v in lookup_variations(icon) if v in file_index), None)
+        if target is not None and alias not in file_index:
+            names.append((alias, file_index[target]))
+            exact_aliases[alias] = file_index[target]
+
+    entries: dict[tuple[str, ...], tuple[str, int]] = {}
+    for name, index in names:
+        tokens = name_tokens(name)
+        key = tuple(sorted(tokens))
+        if tokens and (key not in entries or len(name) < len(entries[key][0])):
+            entries[key] = (name, index)
+
+    entry_list = sorted(entries.items(), key=lambda item: item[1][0])
+    postings: dict[str, list[int]] = {}
+    for i, (key, _) in enumerate(entry_list):
+        for token in key:
+            postings.setdefault(token, []).append(i)
+
+    weights = {token: round(math.log(1 + len(entry_list) / len(ids)), 3) for token, ids in postings.items()}
+    return {
+        "version": 1,
+        "files": files,
+        "aliases": exact_aliases,
+        "entries": [[index, round(sum(weights[t] for t in key), 3), head_token(name_tokens(name))]
+                    for key, (name, index) in entry_list],
+        "tokens": {token: [weights[token], ids] for token, ids in sorted(postings.items())},
+    }
+
+
+class Resolver:
+    """Reference implementation of the lookup the app performs with resolver.json."""
+
+    def __init__(self, index: dict):
+        self.files = index["files"]
+        self.names = {Path(file).stem: i for i, file in enumerate(self.files)}
+        self.names.update(index.get("aliases", {}))
+        self.entries = index["entries"]
+        self.tokens = index["tokens"]
+
+    @classmethod
+    def load(cls, path: Path) -> "Resolver":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def exact(self, name: str) -> str | None:
+        """What the client's exact/plural lookup finds, for comparison."""
+        for variation in lookup_variations(normalize_name(name)):
+            if variation in self.names:
+                return self.files[self.names[variation]]
+        return None
+
+    def match(self, name: str) -> tuple[str | None, float]:
+        """Best icon file for `name` and its score (exact hits score 2)."""
+        file = self.exact(name)
+        if file is not None:
+            return file, 2.0
+
+        # Words the icon set doesn't know (brands, adjectives, sizes) are ignored
+        query = [token for token in name_tokens(name) if token in self.tokens]
+        if not query:
+            return None, 0.0
+        head = head_token(query)
+        query_weight = sum(self.tokens[token][0] for token in query)
+
+        matched: dict[int, float] = {}
+        for token in query:
+            weight, ids = self.tokens[token]
+            for i in ids:
+                matched[i] = matched.get(i, 0.0) + weight
+
+        best, best_score = None, 0.0
+        for i, weight in matched.items():
+            file, entry_weight, entry_head = self.entries[i]
+            # Weighted Jaccard between the query and the entry's tokens
+            score = weight / (query_weight + entry_weight - weight)
+            if entry_head == head:
+                score += HEAD_BONUS
+            elif entry_head not in query:
+                score *= HEAD_MISSING
+            if score > best_score or (score == best_score and best is not None and entry_weight < self.entries[best][1]):
+                best, best_score = i, score
+
+        if best is None or best_score < MIN_SCORE:
+            return None, best_score
+        return self.files[self.entries[best][0]], best_score
+
+    def resolve(self, name: str) -> str | None:
+        return self.match(name)[0]
+
+
+def read_sample(path: Path) -> list[tuple[str, str | None]]:
+    """Sample corpus: one item name per line, optionally a tab and the expected icon name."""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, _, expected = line.partition("\t")
+            samples.append((name.strip(), expected.strip() or None))
+    return samples
+
+
+def evaluate_resolver(resolver: Resolver, samples: list[tuple[str, str | None]]) -> dict:
+    """Hit rates of the exact lookup and the resolver, accuracy where expectations are given."""
+    exact = hits = checked = correct = 0
+    wrong = []
+    start = time.perf_counter()
+    for name, _ in samples:
+        resolver.resolve(name)
+    per_lookup = (time.perf_counter() - start) / len(samples) if samples else 0.0
+
+    for name, expected in samples:
+        exact += resolver.exact(name) is not None
+        file = resolver.resolve(name)
+        hits += file is not None
+        if expected is not None:
+            checked += 1
+            if (file and Path(file).stem) == (expected if expected != "-" else None):
+                correct += 1
+            else:
+                wrong.append((name, file, expected))
+
+    return {
+        "samples": len(samples),
+        "exact_hits": exact,
+        "hits": hits,
+        "checked": checked,
+        "correct": correct,
+        "wrong": wrong,
+        "us_per_lookup": per_lookup * 1e6,
+    }
+
+
+def print_resolver_report(stats: dict) -> None:
+    total = stats["samples"] or 1
+    print(f"Sample of {stats['samples']} names: exact lookup {stats['exact_hits'] / total * 100:.1f}%, "
+          f"resolver {stats['hits'] / total * 100:.1f}% "
+          f"({stats['us_per_lookup']:.1f} us/lookup)")
+    if stats["checked"]:
+        print(f"Matched the expected icon for {stats['correct']}/{stats['checked']} labelled names")
+        for name, file, expected in stats["wrong"][:20]:
+            print(f"  {name!r}: got {file or '-'}, expected {expected}")
@@ -0,0 +1,445 @@
+"""Generation runs - metrics, the job journal and the concurrent driver."""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .cache import RawCache
+from .config import MAX_BATCH, OPENROUTER_BASE_URL
+from .generate import IconResult, ImageAttempt, ModelRouter, generate_icon_batch, generate_icon_openrouter
+from .imaging import ProcessOptions
+from .net import AdaptiveConcurrency, HttpClient, get_http_client
+from .util import log, safe_filename
+
+
+METRIC_FIELDS = ("queue_wait", "http_time", "process_time", "response_bytes",
+                 "output_bytes", "prompt_tokens", "completion_tokens", "cost")
+
+
+def format_duration(seconds: float) -> str:
+    """Compact h/m/s rendering for ETAs."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class RunMetrics:
+    """
+    Per-request metrics for a generation run.
+    Each IconResult is appended to a JSONL file with its queue wait, HTTP
+    latency, decode/resize time, byte sizes, tokens and cost. Running totals
+    feed the progress line and an optional Prometheus textfile (for
+    node_exporter's textfile collector), rewritten at most every few seconds.
+    With `concurrency`, its current limit is recorded alongside.
+    """
+
+    def __init__(self, path: Path | None, total: int, textfile: Path | None = None,
+                 progress_interval: float = 5.0, textfile_interval: float = 5.0,
+                 concurrency: AdaptiveConcurrency | None = None):
+        self.path = path
+        self.total = total
+        self.textfile = textfile
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.textfile_interval = textfile_interval
+        self.start = time.monotonic()
+        self.counts: dict[str, int] = {}
+        self.sums = dict.fromkeys(METRIC_FIELDS, 0)
+        self.request_times: list[float] = []  # One per HTTP request, not per icon
+        self.hedge_losers = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+        self._last_textfile = 0.0
+        self._file = open(path, "a") if path else None
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, result: IconResult) -> None:
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "name": result.name,
+            "status": result.status,
+            "error": result.error,
+            "latency": round(result.latency, 3),
+            "retries": result.retries,
+            "model": result.model,
+            "hedged": result.hedged,
+            "requests": len(result.request_times),
+        }
+        if self.concurrency:
+            entry["concurrency_limit"] = self.concurrency.current()
+        for field in METRIC_FIELDS:
+            value = getattr(result, field)
+            entry[field] = round(value, 6 if field == "cost" else 3) if isinstance(value, float) else value
+
+        with self._lock:
+            if self._file:
+                self._file.write(json.dumps(entry) + "\n")
+                self._file.flush()
+            self.counts[result.status] = self.counts.get(result.status, 0) + 1
+            for field in METRIC_FIELDS:
+                self.sums[field] += getattr(result, field)
+            self.request_times.extend(result.request_times)
+            self.retries += result.retries
+            if self.textfile and time.monotonic() - self._last_textfile >= self.textfile_interval:
+                self._last_textfile = time.monotonic()
+                self.write_textfile()
+
+    def record_loser(self, attempt: ImageAttempt) -> None:
+        """
+        Count a losing hedge that finished after its icon was recorded; its
+        request and cost are real spend even though no icon came of it.
+        """
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": "hedge_lost",
+            "model": attempt.model,
+            "error": attempt.error,
+            "retries": attempt.retries,
+            "requests": 1,
+            "http_time": round(attempt.http_time, 3),
+            "response_bytes": attempt.response_bytes,
+            "prompt_tokens": attempt.prompt_tokens,
+            "completion_tokens": attempt.completion_tokens,
+            "cost": round(attempt.cost, 6),
+        }
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.write(json.dumps(entry) + "\n")
+                self._file.flush()
+            self.hedge_losers += 1
+            self.retries += attempt.retries
+            self.request_times.append(attempt.http_time)
+            for field in ("http_time", "response_bytes", "prompt_tokens", "completion_tokens", "cost"):
+                self.sums[field] += getattr(attempt, field)
+
+    def rate(self) -> float:
+        """Completed items per second since the run started."""
+        elapsed = time.monotonic() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> float | None:
+        rate = self.rate()
+        return (self.total - self.done) / rate if rate else None
+
+    def progress(self) -> str:
+        done = self.done
+        eta = self.eta()
+        failed = self.counts.get("failed", 0)
+        line = (f"Progress: {done}/{self.total} ({done / max(1, self.total):.0%}), "
+                f"{self.rate() * 60:.1f}/min, ETA {format_duration(eta) if eta is not None else '?'}")
+        if failed:
+            line += f", {failed} failed"
+        if self.concurrency:
+            line += f", limit {self.concurrency.current()}"
+        if self.sums["cost"]:
+            line += f", ${self.sums['cost']:.4f} spent"
+        return line
+
+    def log_progress(self, final: bool = False) -> None:
+        """Log the progress line, at most once per progress_interval."""
+        now = time.monotonic()
+        if final or now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            log(self.progress())
+
+    def summary(self) -> list[str]:
+        """Human-readable totals for the end-of-run report."""
+        requests_made = len(self.request_times)
+        generated = self.counts.get("generated", 0)
+        lines = [f"Rate: {self.rate() * 60:.1f} items/min over {format_duration(time.monotonic() - self.start)}"]
+        if requests_made:
+            ordered = sorted(self.request_times)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            extra = "".join([f", {self.retries} retries" if self.retries else "",
+                             f", {self.hedge_losers} lost hedges" if self.hedge_losers else ""])
+            lines.append(f"HTTP: {requests_made} requests{extra}, mean {sum(ordered) / requests_made:.1f}s, "
+                         f"p95 {p95:.1f}s, {self.sums['response_bytes'] / 1024 / 1024:.1f} MB received")
+        if generated:
+            lines.append(f"Processing: mean {self.sums['process_time'] / generated * 1000:.0f} ms/icon, "
+                         f"{self.sums['output_bytes'] / 1024:.0f} KB written")
+        if self.concurrency:
+            c = self.concurrency
+            lines.append(f"Concurrency: limit {c.current()} (range {int(c.lowest)}-{int(c.peak)}), "
+                         f"{c.decreases} backoffs")
+        if self.sums["prompt_tokens"] or self.sums["completion_tokens"]:
+            lines.append(f"Tokens: {self.sums['prompt_tokens']} prompt, {self.sums['completion_tokens']} completion")
+        if self.sums["cost"]:
+            per_icon = self.sums["cost"] / max(1, generated)
+            lines.append(f"Cost: ${self.sums['cost']:.4f} (${per_icon:.5f} per icon)")
+        return lines
+
+    def write_textfile(self) -> None:
+        """Write the Prometheus textfile atomically (the collector may read at any time)."""
+        lines = [
+            "# HELP foodicons_results_total Generation results by status.",
+            "# TYPE foodicons_results_total counter",
+        ]
+        lines += [f'foodicons_results_total{{status="{status}"}} {n}' for status, n in sorted(self.counts.items())]
+        for name, field, help_text in (
+            ("foodicons_queue_wait_seconds_total", "queue_wait", "Time items waited for a worker."),
+            ("foodicons_http_seconds_total", "http_time", "Time spent in OpenRouter requests, including retries."),
+            ("foodicons_process_seconds_total", "process_time", "Time spent decoding and resizing images."),
+            ("foodicons_response_bytes_total", "response_bytes", "Response body bytes received."),
+            ("foodicons_output_bytes_total", "output_bytes", "Icon bytes written."),
+            ("foodicons_cost_dollars_total", "cost", "OpenRouter cost reported in usage."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {self.sums[field]:g}"]
+        lines += [
+            "# HELP foodicons_tokens_total Tokens reported in usage.",
+            "# TYPE foodicons_tokens_total counter",
+            f'foodicons_tokens_total{{kind="prompt"}} {self.sums["prompt_tokens"]}',
+            f'foodicons_tokens_total{{kind="completion"}} {self.sums["completion_tokens"]}',
+            "# HELP foodicons_items_per_second Completion rate since the run started.",
+            "# TYPE foodicons_items_per_second gauge",
+            f"foodicons_items_per_second {self.rate():g}",
+            "# HELP foodicons_remaining_items Items not yet completed.",
+            "# TYPE foodicons_remaining_items gauge",
+            f"foodicons_remaining_items {self.total - self.done}",
+        ]
+        if self.concurrency:
+            lines += [
+                "# HELP foodicons_concurrency_limit Current adaptive in-flight request limit.",
+                "# TYPE foodicons_concurrency_limit gauge",
+                f"foodicons_concurrency_limit {self.concurrency.current()}",
+                "# HELP foodicons_in_flight_requests Requests currently holding a slot.",
+                "# TYPE foodicons_in_flight_requests gauge",
+                f"foodicons_in_flight_requests {self.concurrency.in_flight}",
+                "# HELP foodicons_concurrency_backoffs_total Times the limit was reduced.",
+                "# TYPE foodicons_concurrency_backoffs_total counter",
+                f"foodicons_concurrency_backoffs_total {self.concurrency.decreases}",
+            ]
+        lines += [
+            "# HELP foodicons_last_update_timestamp_seconds When this file was written.",
+            "# TYPE foodicons_last_update_timestamp_seconds gauge",
+            f"foodicons_last_update_timestamp_seconds {time.time():.0f}",
+        ]
+        tmp = self.textfile.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.textfile)
+
+    def close(self) -> None:
+        with self._lock:
+            if self.textfile:
+                self.write_textfile()
+            if self._file:
+                self._file.close()
+
+
+# =============================================================================
+# Job Journal - durable per-item record of generation runs
+# =============================================================================
+class Journal:
+    """
+    Append-only JSONL log of per-item generation outcomes.
+    Each line records one attempt; the latest line per name is its current
+    state. Lines are fsynced as they are written, so a crash or Ctrl-C never
+    loses more than the request that was in flight.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        if path.exists():
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from a crash
+                    self.entries[entry["name"]] = entry
+
+        self._file = open(path, "a")
+
+    def get(self, name: str) -> dict | None:
+        return self.entries.get(name)
+
+    def attempts(self, name: str) -> int:
+        entry = self.entries.get(name)
+        return entry["attempts"] if entry else 0
+
+    def record(self, result: IconResult) -> dict:
+        with self._lock:
+            attempts = self.attempts(result.name)
+            if result.status != "skipped":
+                attempts += 1
+            entry = {
+                "name": result.name,
+                "status": result.status,
+                "attempts": attempts,
+                "latency": round(result.latency, 3),
+                "retries": result.retries,
+                "error": result.error,
+                "sha256": result.sha256,
+                "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.entries[result.name] = entry
+            return entry
+
+    def refresh_digests(self, output_dir: Path, foods: list) -> int:
+        """
+        Re-journal the sha256 of icons rewritten since they were recorded
+        (e.g. by the optimize pass), so the latest entry describes the file
+        that ships. Returns how many entries were updated.
+        """
+        updated = 0
+        with self._lock:
+            for food in foods:
+                name = food["name"] if isinstance(food, dict) else food
+                entry = self.entries.get(name)
+                path = output_dir / f"{safe_filename(name)}.png"
+                if not entry or not entry.get("sha256") or not path.exists():
+                    continue
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                if digest == entry["sha256"]:
+                    continue
+                entry = dict(entry, sha256=digest, time=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+                self._file.write(json.dumps(entry) + "\n")
+                self.entries[name] = entry
+                updated += 1
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return updated
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entry in self.entries.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def select_pending(foods: list, journal: Journal, output_dir: Path,
+                   resume: bool = False, retry_failed: bool = False,
+                   max_attempts: int | None = None) -> list:
+    """
+    Pick the foods that still need work according to the journal.
+    --resume skips items already done; --retry-failed keeps only items whose
+    last attempt failed; --max-attempts drops items that failed too often.
+    """
+    pending = []
+    for food in foods:
+        name = food["name"] if isinstance(food, dict) else food
+        entry = journal.get(name)
+        status = entry["status"] if entry else None
+
+        if max_attempts is not None and status == "failed" and entry["attempts"] >= max_attempts:
+            continue
+        if retry_failed and status != "failed":
+            continue
+        if resume and status in ("generated", "skipped") \
+                and (output_dir / f"{safe_filename(name)}.png").exists():
+            continue
+        pending.append(food)
+    return pending
+
+
+def generate_icons(foods: list, output_dir: Path, api_key: str,
+                   jobs: int = 1, delay: float = 1.0,
+                   client: HttpClient | None = None,
+                   journal: Journal | None = None,
+                   cache: RawCache | None = None,
+                   options: ProcessOptions | None = None,
+                   base_url: str = OPENROUTER_BASE_URL,
+                   metrics: RunMetrics | None = None,
+                   concurrency: AdaptiveConcurrency | None = None,
+                   batch_size: int = 1,
+                   router: ModelRouter | None = None) -> tuple[int, int]:
+    """
+    Generate icons for a list of foods, keeping up to `jobs` requests in flight.
+    Each worker waits `delay` seconds after its request (rate limiting).
+    With `concurrency`, `jobs` is only the ceiling: the AIMD controller decides
+    how many requests are actually in flight.
+    With `batch_size` > 1, foods are requested `batch_size` at a time as one
+    grid image (generate_icon_batch); rejected cells fall back to single
+    requests in the same worker.
+    `router` holds the model fallback chain, hedging and circuit breakers and
+    is shared by every worker.
+    Every outcome is written to `journal` and `metrics` if given; metrics
+    also drive a progress line with rate and ETA.
+    A worker that raises counts its items as failed.
+    On Ctrl-C, queued items are cancelled, in-flight requests are drained
+    and KeyboardInterrupt is re-raised. Returns (success, failed) counts.
+    """
+    total = len(foods)
+    client = client or get_http_client()
+    router = router or ModelRouter(hedge=False)
+
+    def work(i: int, chunk: list, queued: float) -> list[IconResult]:
+        names = [food["name"] if isinstance(food, dict) else food for food in chunk]
+        if len(names) == 1:
+            log(f"[{i}/{total}] {names[0]}")
+        else:
+            log(f"[{i}-{i + len(names) - 1}/{total}] {', '.join(names)}")
+        queue_wait = time.monotonic() - queued
+
+        results, leftovers, uncharged = [], names, []
+        if len(names) > 1:
+            results, leftovers, uncharged = generate_icon_batch(names, output_dir, api_key, client, cache,
+                                                                options, base_url, concurrency, router)
+        for i, name in enumerate(leftovers):
+            result = generate_icon_openrouter(name, output_dir, api_key, client, cache, options,
+                                              base_url, concurrency, router)
+            if i == 0 and uncharged:
+                result.charge(uncharged)  # The grid request that produced no icon
+            results.append(result)
+
+        for result in results:
+            result.queue_wait = queue_wait
+            if journal:
+                journal.record(result)
+            if metrics:
+                metrics.record(result)
+        time.sleep(delay)  # Rate limiting
+        return results
+
+    success = 0
+    failed = 0
+
+    batch_size = max(1, min(batch_size, MAX_BATCH))
+    executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+    # Future -> number of foods it covers
+    futures = {executor.submit(work, i + 1, foods[i:i + batch_size], time.monotonic()): len(foods[i:i + batch_size])
+               for i in range(0, total, batch_size)}
+    try:
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                log(f"  Error: worker failed - {e}")
+                failed += futures[future]
+            else:
+                success += sum(1 for r in results if r.ok)
+                failed += sum(1 for r in results if not r.ok)
+            if metrics:
+                metrics.log_progress(final=success + failed == total)
+    except KeyboardInterrupt:
+        in_flight = sum(1 for f in futures if f.running())
+        log(f"\nInterrupted - waiting for {in_flight} in-flight requests to finish...")
+        executor.shutdown(wait=True, cancel_futures=True)
+        finished = [f for f in futures if f.done() and not f.cancelled() and f.exception() is None]
+        log(f"Checkpointed {sum(len(f.result()) for f in finished)} of {total} items")
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+    return success, failed
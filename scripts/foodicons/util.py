@@ -0,0 +1,19 @@
+"""Small helpers shared across subcommands."""
+
+import threading
+
+
+# Serializes output from worker threads so lines don't interleave
+_print_lock = threading.Lock()
+
+
+def log(message: str = "") -> None:
+    """Thread-safe print."""
+    with _print_lock:
+        print(message, flush=True)
+
+
+def safe_filename(food_name: str) -> str:
+    """Sanitize a food name into an icon filename stem."""
+    safe_name = food_name.replace(" ", "_").replace("/", "_").lower()
+    return "".join(c for c in safe_name if c.isalnum() or c == "_")
@@ -0,0 +1,159 @@
+"""Web publish - mirror the icon directory into the app's public/ folder."""
+
+import os
+import sys
+import json
+import ctypes
+import shutil
+import hashlib
+from pathlib import Path
+
+from .config import ATLAS_INDEX, MANIFEST_FILE
+from .resolver import RESOLVER_FILE
+
+
+ICON_MAP_FILE = "icon-map.json"
+ATLAS_WEB_DIR = "atlas"  # Sprite sheets are published under dest/atlas/
+HASHED_SUFFIXES = {".png", ".webp", ".avif"}
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def hashed_name(rel: Path, digest: str) -> Path:
+    """apple.png -> apple.<first 8 hex of sha256>.png"""
+    return rel.with_name(f"{rel.stem}.{digest[:8]}{rel.suffix}")
+
+
+def _tree(root: Path) -> list[Path]:
+    """Relative paths of the visible files under root."""
+    if not root.exists():
+        return []
+    return sorted(path.relative_to(root) for path in root.rglob("*")
+                  if path.is_file() and not any(part.startswith(".") for part in path.relative_to(root).parts))
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _exchange(a: Path, b: Path) -> bool:
+    """Atomically swap two paths with renameat2(RENAME_EXCHANGE). False where unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False  # glibc < 2.28 or another libc
+    at_fdcwd, rename_exchange = -100, 2
+    if renameat2(at_fdcwd, os.fsencode(a), at_fdcwd, os.fsencode(b), rename_exchange) == 0:
+        return True
+    errno = ctypes.get_errno()
+    if errno in (22, 38, 95):  # EINVAL, ENOSYS, EOPNOTSUPP: the filesystem can't exchange
+        return False
+    raise OSError(errno, os.strerror(errno), str(a), None, str(b))
+
+
+def publish_web_icons(source: Path, dest: Path, hashed: bool = False, atlas_dir: Path | None = None) -> dict:
+    """
+    Make `dest` an exact copy of `source` (plus `atlas_dir` under
+    ATLAS_WEB_DIR, if given), moving only what changed.
+    The new tree is staged next to `dest` (unchanged files are hard links to
+    the published ones, so only changed bytes are written) and swapped in
+    with one renameat2(RENAME_EXCHANGE) (two back-to-back renames where
+    that's unsupported), so the app never sees a mix of old and new icons.
+    With `hashed`, every icon is also published as name.<hash>.ext and
+    icon-map.json plus the manifest/resolver/atlas indexes point at those
+    names, which stay correct under `Cache-Control: immutable`. The hashed
+    files of the publish being replaced (those in its icon-map.json) are
+    kept for one more publish, so pages loaded before the swap still find them.
+    Returns publish stats.
+    """
+    files = {rel: source / rel for rel in _tree(source)}
+    if atlas_dir is not None:
+        files.update({ATLAS_WEB_DIR / rel: atlas_dir / rel for rel in _tree(atlas_dir)})
+    digests = {rel: file_digest(path) for rel, path in files.items()}
+
+    # Published path -> (source file or generated bytes, content digest)
+    plan: dict[Path, tuple[Path | bytes, str]] = {rel: (files[rel], digest) for rel, digest in digests.items()}
+    if hashed:
+        icon_map = {str(rel): str(hashed_name(rel, digest))
+                    for rel, digest in digests.items() if rel.suffix in HASHED_SUFFIXES}
+        for rel, name in icon_map.items():
+            plan[Path(name)] = (files[Path(rel)], digests[Path(rel)])
+
+        generated = {Path(ICON_MAP_FILE): icon_map}
+        # Index file -> the list of file names in it, relative to the index's directory
+        indexes = {Path(MANIFEST_FILE): "files", Path(RESOLVER_FILE): "files",
+                   Path(ATLAS_WEB_DIR, ATLAS_INDEX): "sheets"}
+        for index_file, key in indexes.items():
+            if index_file in digests:
+                with open(files[index_file]) as f:
+                    index = json.load(f)
+                base = index_file.parent
+                index[key] = [Path(icon_map.get(str(base / file), base / file)).relative_to(base).as_posix()
+                              for file in index[key]]
+                generated[index_file] = index
+        for rel, data in generated.items():
+            body = json.dumps(data, separators=(",", ":"), sort_keys=rel.name == ICON_MAP_FILE).encode()
+            plan[rel] = (body, hashlib.sha256(body).hexdigest())
+
+    published = set(_tree(dest))
+    kept = 0
+    if (dest / ICON_MAP_FILE).exists():
+        with open(dest / ICON_MAP_FILE) as f:
+            live_map = json.load(f)
+        for name in live_map.values():
+            rel = Path(name)
+            if rel not in plan and rel in published:
+                plan[rel] = (dest / rel, file_digest(dest / rel))
+                kept += 1
+
+    stats = {"files": len(plan), "added": 0, "changed": 0, "unchanged": 0, "kept": kept,
+             "removed": len(published - set(plan)), "bytes_written": 0, "swapped": False}
+
+    staging = dest.with_name(f".{dest.name}.staging")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staged: dict[str, Path] = {}  # Digest -> a file already in staging with that content
+    # Source files first, so hashed copies can link to their plain-named twin
+    for rel, (content, digest) in sorted(plan.items(), key=lambda item: (item[0] not in digests, item[0])):
+        target = staging / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if rel in published and file_digest(dest / rel) == digest:
+            stats["unchanged"] += 1
+            _link_or_copy(dest / rel, target)
+        else:
+            stats["changed" if rel in published else "added"] += 1
+            if digest in staged:
+                # Hashed copies share their content with the plain name
+                _link_or_copy(staged[digest], target)
+            elif isinstance(content, bytes):
+                target.write_bytes(content)
+                stats["bytes_written"] += len(content)
+            else:
+                shutil.copy2(content, target)
+                stats["bytes_written"] += target.stat().st_size
+        staged.setdefault(digest, target)
+
+    if not (stats["added"] or stats["changed"] or stats["removed"]):
+        shutil.rmtree(staging)
+        return stats
+
+    if not dest.exists():
+        os.rename(staging, dest)
+    elif _exchange(staging, dest):
+        shutil.rmtree(staging)  # Now holds the old tree
+    else:
+        previous = dest.with_name(f".{dest.name}.previous")
+        if previous.exists():
+            shutil.rmtree(previous)
+        os.rename(dest, previous)
+        os.rename(staging, dest)
+        shutil.rmtree(previous)
+    stats["swapped"] = True
+    return stats
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Generation Load Test
+Drives the real foodicons generate_icons() against openrouter_standin.py and
+reports items/sec plus p50/p95/p99 per-item latency (including retries), so
+concurrency and retry behavior can be checked without spending credits.
+
+Usage:
+    # Start an in-process stand-in with faults and run 200 items at 8 jobs
+    python load_test.py --items 200 --jobs 8 --latency 0.5 --latency-sigma 0.6 \
+        --rate-429 0.05 --burst-5xx 0.01 --malformed 0.02
+
+    # Drive an already running stand-in
+    python load_test.py --url http://127.0.0.1:8090/api/v1 --items 200 --jobs 8
+
+    # Check the AIMD controller settles under a provider concurrency cap
+    python load_test.py --adaptive --jobs 32 --capacity 10 --retry-after 0.5
+
+    # Heavy-tailed latency with hedging, and a dead primary model to fall back from
+    python load_test.py --latency 0.3 --latency-sigma 1.0 --hedge
+    python load_test.py --models primary,fallback --fail-model primary
+
+    # Batch 4 foods per request, with some cells failing validation
+    python load_test.py --batch 4 --bad-cells 0.1
+
+    # Sweep job counts and keep the numbers
+    python load_test.py --jobs 1,4,16 --save load_results.json
+"""
+
+import io
+import sys
+import json
+import math
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+
+from foodicons.config import ICON_MODEL
+from foodicons.generate import ModelRouter
+from foodicons.net import AdaptiveConcurrency, HttpClient
+from foodicons.run import Journal, generate_icons
+from openrouter_standin import FaultConfig, start_server
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def run_load(base_url: str, items: int, jobs: int, max_retries: int = 4,
+             backoff_base: float = 1.0, verbose: bool = False, adaptive: bool = False,
+             batch_size: int = 1, models: list[str] | None = None, hedge: bool = False) -> dict:
+    """
+    One generate_icons() run against base_url. Returns throughput and latency stats.
+    With `adaptive`, `jobs` is the ceiling for the AIMD controller.
+    """
+    foods = [f"load test item {i:05d}" for i in range(items)]
+    client = HttpClient(pool_size=max(10, jobs), max_retries=max_retries, backoff_base=backoff_base)
+    concurrency = AdaptiveConcurrency(initial=min(4, jobs), maximum=jobs) if adaptive else None
+    router = ModelRouter(models or [ICON_MODEL], hedge=hedge, max_in_flight=jobs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp) / "icons"
+        output_dir.mkdir()
+        journal = Journal(Path(tmp) / "journal.jsonl")
+
+        out = sys.stdout if verbose else io.StringIO()
+        start = time.monotonic()
+        with contextlib.redirect_stdout(out):
+            success, failed = generate_icons(foods, output_dir, "load-test", jobs=jobs, delay=0,
+                                             client=client, journal=journal, base_url=base_url,
+                                             concurrency=concurrency, batch_size=batch_size, router=router)
+        elapsed = time.monotonic() - start
+        journal.close()
+        entries = list(journal.entries.values())
+
+    latencies = [entry["latency"] for entry in entries]
+    errors: dict[str, int] = {}
+    for entry in entries:
+        if entry["error"]:
+            reason = entry["error"].split(":")[0][:40]
+            errors[reason] = errors.get(reason, 0) + 1
+
+    result = {
+        "jobs": jobs,
+        "items": items,
+        "generated": success,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(items / elapsed, 2),
+        "p50": round(percentile(latencies, 50), 3),
+        "p95": round(percentile(latencies, 95), 3),
+        "p99": round(percentile(latencies, 99), 3),
+        "retries": sum(entry["retries"] for entry in entries),
+        "errors": errors,
+    }
+    result["models"] = {model: dict(outcome, circuit=router.breakers[model].state)
+                        for model, outcome in router.outcomes.items()}
+    result["hedges"] = {"sent": router.hedges, "won": router.hedges_won, "fallbacks": router.fallbacks}
+    if concurrency:
+        result["concurrency"] = {"final": concurrency.current(), "lowest": int(concurrency.lowest),
+                                 "peak": int(concurrency.peak), "backoffs": concurrency.decreases}
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test `foodicons generate` against a local OpenRouter stand-in")
+    parser.add_argument("--items", type=int, default=100,
+                       help="Foods to generate per run")
+    parser.add_argument("--jobs", type=str, default="8",
+                       help="Concurrent jobs; a comma list runs a sweep")
+    parser.add_argument("--batch", type=int, default=1,
+                       help="Foods per request (grid batches)")
+    parser.add_argument("--models", type=str, default=ICON_MODEL,
+                       help="Comma-separated models in fallback order")
+    parser.add_argument("--hedge", action="store_true",
+                       help="Hedge requests that run past the model's p95 latency")
+    parser.add_argument("--fail-model", action="append", default=[],
+                       help="Stand-in answers 503 for this model (repeatable)")
+    parser.add_argument("--adaptive", action="store_true",
+                       help="Use the AIMD concurrency controller with --jobs as the ceiling")
+    parser.add_argument("--max-retries", type=int, default=4,
+                       help="Retries per request for 429/5xx and connection errors")
+    parser.add_argument("--backoff", type=float, default=0.2,
+                       help="Backoff base in seconds (lower than production to keep runs short)")
+    parser.add_argument("--url", type=str, default=None,
+                       help="Use a running stand-in at this base URL instead of starting one")
+    parser.add_argument("--latency", type=float, default=0.2,
+                       help="Median stand-in latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                       help="Log-normal spread of the stand-in latency")
+    parser.add_argument("--rate-429", type=float, default=0.0,
+                       help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                       help="Retry-After seconds sent with 429s")
+    parser.add_argument("--burst-5xx", type=float, default=0.0,
+                       help="Chance per request of starting a 5xx burst")
+    parser.add_argument("--burst-length", type=int, default=5,
+                       help="Consecutive 5xx responses per burst")
+    parser.add_argument("--malformed", type=float, default=0.0,
+                       help="Fraction of 200s with a malformed payload")
+    parser.add_argument("--capacity", type=int, default=0,
+                       help="Stand-in answers 429 above this many concurrent requests")
+    parser.add_argument("--bad-cells", type=float, default=0.0,
+                       help="Fraction of batch grid cells the stand-in leaves empty")
+    parser.add_argument("--image-size", type=int, default=1024,
+                       help="Edge length of the stand-in's images")
+    parser.add_argument("--seed", type=int, default=None,
+                       help="Seed for reproducible fault sequences")
+    parser.add_argument("--verbose", action="store_true",
+                       help="Show the generator's per-item output")
+    parser.add_argument("--save", type=str, default=None,
+                       help="Write the results as JSON to this path")
+
+    args = parser.parse_args()
+
+    config = None
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        config = FaultConfig(args.latency, args.latency_sigma, args.rate_429, args.retry_after,
+                             args.burst_5xx, args.burst_length, args.malformed, args.seed, args.capacity,
+                             args.bad_cells, tuple(args.fail_model))
+        server = start_server(0, config, args.image_size)
+        base_url = f"http://127.0.0.1:{server.server_port}/api/v1"
+    print(f"Target: {base_url}")
+
+    results = []
+    for jobs in [int(j) for j in args.jobs.split(",") if j.strip()]:
+        served = config.stats["requests"] if config else 0
+        result = run_load(base_url, args.items, jobs, args.max_retries, args.backoff, args.verbose,
+                          args.adaptive, args.batch, [m.strip() for m in args.models.split(",") if m.strip()],
+                          args.hedge)
+        if config:
+            result["requests"] = config.stats["requests"] - served
+        results.append(result)
+        print(f"  {jobs:>3} jobs  {result['items_per_sec']:7.2f} items/s  "
+              f"p50 {result['p50']:6.2f}s  p95 {result['p95']:6.2f}s  p99 {result['p99']:6.2f}s  "
+              f"{result['failed']} failed, {result['retries']} retries"
+              + (f", {result['requests']} requests" if config else ""))
+        if args.hedge or len(result["models"]) > 1:
+            print(f"             hedges {result['hedges']['sent']} sent/{result['hedges']['won']} won, "
+                  f"{result['hedges']['fallbacks']} fallbacks; "
+                  + "; ".join(f"{m} {o['ok']} ok/{o['failed']} failed ({o['circuit']})"
+                              for m, o in result["models"].items()))
+        if "concurrency" in result:
+            c = result["concurrency"]
+            print(f"             limit {c['final']} (range {c['lowest']}-{c['peak']}), {c['backoffs']} backoffs")
+        for reason, count in sorted(result["errors"].items(), key=lambda item: -item[1]):
+            print(f"             {count:4} x {reason}")
+
+    if config:
+        print(f"\nStand-in served: {config.stats}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"target": base_url, "server": config.stats if config else None,
+                       "runs": results}, f, indent=2)
+        print(f"Results saved to: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Open Food Facts Stand-in
+Serves recorded Open Food Facts responses from fixtures/off so the food list
+fetcher (including fetch --harvest) can run offline and deterministically.
+
+Usage:
+    python off_standin.py --port 8089
+
+    # In another shell
+    python -m foodicons fetch --harvest --harvest-rate 600 \
+        --off-url http://127.0.0.1:8089
+
+Fixtures:
+    fixtures/off/categories.json          GET /categories.json
+    fixtures/off/ingredients.json         GET /ingredients.json
+    fixtures/off/search/<category>.json   GET /api/v2/search?categories_tags=<category>
+                                          (":" in the tag becomes "_"; paginated
+                                          here with page / page_size)
+
+Responses carry an ETag and honor If-None-Match, so the fetcher's HTTP cache
+revalidation can be exercised too.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+
+SCRIPT_DIR = Path(__file__).parent
+FIXTURES_DIR = SCRIPT_DIR / "fixtures" / "off"
+
+
+class OffStandinHandler(BaseHTTPRequestHandler):
+    """Answers the subset of the OFF API the fetcher uses."""
+
+    fixtures_dir = FIXTURES_DIR
+    latency = 0.0
+    requests_served = 0
+    _count_lock = threading.Lock()
+
+    def do_GET(self):
+        with self._count_lock:
+            OffStandinHandler.requests_served += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlparse(self.path)
+        if url.path in ("/categories.json", "/ingredients.json"):
+            self._send_fixture(self.fixtures_dir / url.path.lstrip("/"))
+        elif url.path == "/api/v2/search":
+            self._send_search(parse_qs(url.query))
+        else:
+            self._send_json(404, {"status": 0, "status_verbose": "not found"})
+
+    def _send_fixture(self, path: Path):
+        if not path.exists():
+            self._send_json(404, {"status": 0, "status_verbose": f"missing fixture {path.name}"})
+            return
+        with open(path) as f:
+            self._send_json(200, json.load(f))
+
+    def _send_search(self, query: dict):
+        category = query.get("categories_tags", [""])[0]
+        page = int(query.get("page", ["1"])[0])
+        page_size = int(query.get("page_size", ["24"])[0])
+
+        path = self.fixtures_dir / "search" / f"{category.replace(':', '_')}.json"
+        products = []
+        if path.exists():
+            with open(path) as f:
+                products = json.load(f).get("products", [])
+
+        start = (page - 1) * page_size
+        self._send_json(200, {
+            "count": len(products),
+            "page": page,
+            "page_size": page_size,
+            "products": products[start:start + page_size],
+        })
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the fetcher's output readable
+
+
+def start_server(port: int = 0, fixtures_dir: Path = FIXTURES_DIR,
+                 latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread. Returns the running server."""
+    handler = type("Handler", (OffStandinHandler,), {"fixtures_dir": fixtures_dir, "latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded Open Food Facts fixtures")
+    parser.add_argument("--port", type=int, default=8089,
+                       help="Port to listen on")
+    parser.add_argument("--fixtures", type=str, default=None,
+                       help="Fixtures directory (default: fixtures/off)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                       help="Seconds to wait before answering each request")
+
+    args = parser.parse_args()
+
+    fixtures_dir = Path(args.fixtures) if args.fixtures else FIXTURES_DIR
+    server = start_server(args.port, fixtures_dir, args.latency)
+    print(f"Serving {fixtures_dir} on http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+OpenRouter Stand-in
+Answers POST /api/v1/chat/completions in the shape generate_icon_openrouter()
+parses (choices[0].message.images[].image_url.url as a data URL), with
+injectable latency and faults, so `foodicons generate` can be load-tested offline.
+Batch prompts ("Generate a 3x3 grid ...") get a grid of icons back.
+
+Usage:
+    python openrouter_standin.py --port 8090 --latency 4 --latency-sigma 0.5 \
+        --rate-429 0.05 --burst-5xx 0.01 --malformed 0.02
+
+    # In another shell
+    OPENROUTER_API_KEY=test python -m foodicons generate --jobs 8 \
+        --openrouter-url http://127.0.0.1:8090/api/v1 --output /tmp/icons
+
+Faults (each drawn independently per request, in this order):
+    --capacity    answer 429 whenever more than this many requests are in
+                  flight, like a provider-side concurrency cap
+    --rate-429    answer 429 with a Retry-After header
+    --burst-5xx   start a run of --burst-length consecutive 502/503 responses
+    --malformed   answer 200 with one of: no choices, no images, a non-data
+                  URL, undecodable base64, or a truncated JSON body
+    --bad-cells   leave this fraction of grid cells empty, so batch slicing
+                  has to fall back to single requests
+    --fail-model  answer 503 to every request for this model (repeatable),
+                  to exercise model fallback and circuit breaking
+"""
+
+import re
+import json
+import math
+import time
+import base64
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+
+SCRIPT_DIR = Path(__file__).parent
+ICONS_DIR = SCRIPT_DIR / "food_icons"
+COMPLETIONS_PATH = "/api/v1/chat/completions"
+GRID_PROMPT = re.compile(r"Generate a (\d+)x(\d+) grid")
+BACKGROUND = (253, 247, 228, 255)
+MALFORMED_KINDS = ("no_choices", "no_images", "not_data_url", "bad_base64", "truncated")
+
+
+class FaultConfig:
+    """Latency distribution and fault rates for the stand-in."""
+
+    def __init__(self, latency: float = 0.0, latency_sigma: float = 0.0,
+                 rate_429: float = 0.0, retry_after: float = 1.0,
+                 burst_5xx: float = 0.0, burst_length: int = 5,
+                 malformed: float = 0.0, seed: int | None = None, capacity: int = 0,
+                 bad_cells: float = 0.0, fail_models: tuple[str, ...] = ()):
+        self.latency = latency  # Median seconds per request
+        self.latency_sigma = latency_sigma  # Log-normal spread; 0 = fixed latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.burst_5xx = burst_5xx
+        self.burst_length = burst_length
+        self.malformed = malformed
+        self.capacity = capacity  # 0 = unlimited
+        self.bad_cells = bad_cells
+        self.fail_models = set(fail_models)
+        self.in_flight = 0
+        self.random = random.Random(seed)
+        self.burst_remaining = 0
+        self.stats = {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "malformed": 0}
+        self.lock = threading.Lock()
+
+    def draw(self, model: str = "") -> tuple[float, str]:
+        """Pick (latency, outcome) for the next request."""
+        with self.lock:
+            self.stats["requests"] += 1
+            latency = self.latency
+            if self.latency_sigma and self.latency:
+                latency = self.random.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+            if model in self.fail_models:
+                outcome = "5xx"
+            elif self.capacity and self.in_flight > self.capacity:
+                outcome = "429"
+            elif self.rate_429 and self.random.random() < self.rate_429:
+                outcome = "429"
+            elif self.burst_remaining or (self.burst_5xx and self.random.random() < self.burst_5xx):
+                if not self.burst_remaining:
+                    self.burst_remaining = self.burst_length
+                self.burst_remaining -= 1
+                outcome = "5xx"
+            elif self.malformed and self.random.random() < self.malformed:
+                outcome = self.random.choice(MALFORMED_KINDS)
+            else:
+                outcome = "ok"
+
+            self.stats["malformed" if outcome in MALFORMED_KINDS else outcome] += 1
+            return latency, outcome
+
+
+def load_icons(count: int = 8) -> list[Image.Image]:
+    """Existing icons to answer with, or a plain placeholder if there are none."""
+    icons = [Image.open(path).convert("RGBA") for path in sorted(ICONS_DIR.glob("*.png"))[:count]]
+    if not icons:
+        icon = Image.new("RGBA", (32, 32), BACKGROUND)
+        icon.paste((217, 119, 6, 255), (8, 8, 24, 24))
+        icons.append(icon)
+    return icons
+
+
+def encode_png(img: Image.Image) -> str:
+    buf = BytesIO()
+    img.save(buf, "PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def render_grid(icons: list[Image.Image], cols: int, rows: int, size: int,
+                bad_cells: float = 0.0, rng: random.Random | None = None) -> str:
+    """A size x size grid image with one icon per cell, like a batch response."""
+    rng = rng or random.Random()
+    sheet = Image.new("RGBA", (size, size), BACKGROUND)
+    cell_w, cell_h = size // cols, size // rows
+    icon_size = int(min(cell_w, cell_h) * 0.8)
+    for i in range(cols * rows):
+        if bad_cells and rng.random() < bad_cells:
+            continue
+        icon = rng.choice(icons).resize((icon_size, icon_size), Image.Resampling.NEAREST)
+        x = i % cols * cell_w + (cell_w - icon_size) // 2
+        y = i // cols * cell_h + (cell_h - icon_size) // 2
+        sheet.paste(icon, (x, y))
+    return encode_png(sheet)
+
+
+class OpenRouterStandinHandler(BaseHTTPRequestHandler):
+    """Answers chat completion requests with canned images or injected faults."""
+
+    config = FaultConfig()
+    icons: list[Image.Image] = []
+    images: list[str] = []
+    image_size = 1024
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length))
+            prompt = body["messages"][0]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            body, prompt = {}, ""
+        self.model = body.get("model", "")
+        self.grid = GRID_PROMPT.search(prompt)
+
+        if self.path.rstrip("/") != COMPLETIONS_PATH:
+            self._send(404, {"error": {"message": "not found"}})
+            return
+
+        with self.config.lock:
+            self.config.in_flight += 1
+        try:
+            self._respond()
+        finally:
+            with self.config.lock:
+                self.config.in_flight -= 1
+
+    def _respond(self):
+        latency, outcome = self.config.draw(self.model)
+        if latency:
+            time.sleep(latency)
+
+        if outcome == "429":
+            self._send(429, {"error": {"code": 429, "message": "Rate limit exceeded"}},
+                       {"Retry-After": f"{self.config.retry_after:g}"})
+        elif outcome == "5xx":
+            self._send(random.choice((502, 503)), {"error": {"message": "Upstream error"}})
+        elif outcome == "truncated":
+            self._send_body(200, json.dumps(self._completion(self._image_url()))[:200].encode())
+        elif outcome == "no_choices":
+            self._send(200, {"id": "gen-standin", "choices": []})
+        elif outcome == "no_images":
+            self._send(200, self._completion(None))
+        elif outcome == "not_data_url":
+            self._send(200, self._completion("https://example.invalid/icon.png"))
+        elif outcome == "bad_base64":
+            self._send(200, self._completion("data:image/png;base64,not-base64!!"))
+        else:
+            self._send(200, self._completion(self._image_url()))
+
+    def _image_url(self) -> str:
+        if self.grid:
+            cols, rows = int(self.grid.group(1)), int(self.grid.group(2))
+            with self.config.lock:
+                seed = self.config.random.random()
+            data = render_grid(self.icons, cols, rows, self.image_size, self.config.bad_cells, random.Random(seed))
+        else:
+            data = random.choice(self.images)
+        return f"data:image/png;base64,{data}"
+
+    def _completion(self, image_url: str | None) -> dict:
+        message = {"role": "assistant", "content": ""}
+        if image_url is not None:
+            message["images"] = [{"type": "image_url", "image_url": {"url": image_url}}]
+        return {
+            "id": "gen-standin",
+            "model": "standin",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+            "usage": {"prompt_tokens": 180, "completion_tokens": 1290, "total_tokens": 1470, "cost": 0.0387},
+        }
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        self._send_body(status, json.dumps(payload).encode(), headers)
+
+    def _send_body(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the generator's output readable
+
+
+def start_server(port: int = 0, config: FaultConfig | None = None,
+                 image_size: int = 1024) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread. Returns the running server."""
+    icons = load_icons()
+    handler = type("Handler", (OpenRouterStandinHandler,), {
+        "config": config or FaultConfig(),
+        "icons": icons,
+        # Single-icon answers are pre-encoded at model output size
+        "images": [encode_png(icon.resize((image_size, image_size), Image.Resampling.NEAREST)) for icon in icons],
+        "image_size": image_size,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fault-injecting local OpenRouter stand-in")
+    parser.add_argument("--port", type=int, default=8090,
+                       help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0,
+                       help="Median seconds before answering each request")
+    parser.add_argument("--latency-sigma", type=float, default=0.0,
+                       help="Log-normal spread of the latency (0 = always --latency)")
+    parser.add_argument("--rate-429", type=float, default=0.0,
+                       help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                       help="Retry-After seconds sent with 429s")
+    parser.add_argument("--burst-5xx", type=float, default=0.0,
+                       help="Chance per request of starting a 5xx burst")
+    parser.add_argument("--burst-length", type=int, default=5,
+                       help="Consecutive 5xx responses per burst")
+    parser.add_argument("--malformed", type=float, default=0.0,
+                       help="Fraction of 200s with a malformed payload")
+    parser.add_argument("--capacity", type=int, default=0,
+                       help="Answer 429 above this many concurrent requests (0 = unlimited)")
+    parser.add_argument("--bad-cells", type=float, default=0.0,
+                       help="Fraction of batch grid cells left empty")
+    parser.add_argument("--fail-model", action="append", default=[],
+                       help="Answer 503 to every request for this model (repeatable)")
+    parser.add_argument("--image-size", type=int, default=1024,
+                       help="Edge length of the returned images")
+    parser.add_argument("--seed", type=int, default=None,
+                       help="Seed for reproducible fault sequences")
+
+    args = parser.parse_args()
+
+    config = FaultConfig(args.latency, args.latency_sigma, args.rate_429, args.retry_after,
+                         args.burst_5xx, args.burst_length, args.malformed, args.seed, args.capacity,
+                         args.bad_cells, tuple(args.fail_model))
+    server = start_server(args.port, config, args.image_size)
+    print(f"Serving on http://127.0.0.1:{server.server_port}{COMPLETIONS_PATH}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n{config.stats}")
+
+
+if __name__ == "__main__":
+    main()